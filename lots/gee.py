@@ -15,6 +15,7 @@ import math
 import json, csv
 import pathlib
 import time
+import threading, queue, contextlib, heapq, shutil, tempfile
 import subprocess
 import traceback
 import requests
@@ -48,6 +49,101 @@ def getFeatureByIndex(featureCollection, index):
 	'''
 	return ee.Feature(featureCollection.toList(1, index).get(0))
 
+def prefetched(iterator):
+	'''Iterate an iterator with its next item prefetched in a background thread.
+	
+	Parameters:
+		iterator:
+			Type: iterator
+	Yields:
+		items of `iterator`, exceptions are re-raised in the caller
+	'''
+	items = queue.Queue(maxsize=1)
+	stopped = threading.Event()
+	end = object()
+	def producer():
+		try:
+			for item in iterator:
+				while not stopped.is_set():
+					try:
+						items.put((item, None), timeout=0.1); break
+					except queue.Full:
+						pass
+				if stopped.is_set(): return
+			items.put((end, None))
+		except Exception as e:
+			items.put((end, e))
+	thread = threading.Thread(target=producer, daemon=True)
+	thread.start()
+	try:
+		while True:
+			item, error = items.get()
+			if error is not None: raise error
+			if item is end: return
+			yield item
+	finally:
+		stopped.set()
+
+def featurePages(eeFeatColl, pageSize=1000):
+	'''Fetch features of an ee.FeatureCollection page by page, by `ee.data.computeFeatures` with page tokens if available, or else by `toList(pageSize, offset)`.
+	
+	Parameters:
+		eeFeatColl:
+			Type: ee.FeatureCollection object
+		pageSize: features per page
+			Type: integer
+			Default: 1000
+	Yields:
+		list of feature dictionaries (GeoJSON-like)
+	'''
+	eeFeatColl = ee.FeatureCollection(eeFeatColl)
+	if hasattr(ee.data, 'computeFeatures'):
+		pageToken = None
+		while True:
+			params = {'expression': eeFeatColl, 'pageSize': pageSize}
+			if pageToken: params['pageToken'] = pageToken
+			page = ee.data.computeFeatures(params)
+			yield page.get('features', [])
+			pageToken = page.get('nextPageToken')
+			if not pageToken: return
+	else:
+		offset = 0
+		while True:
+			features = eeFeatColl.toList(pageSize, offset).getInfo()
+			yield features
+			if len(features) < pageSize: return
+			offset += pageSize
+
+def iterFeatureDicts(eeFeatColl, pageSize=1000, prefetch=True):
+	'''Iterate features of an ee.FeatureCollection as dictionaries, in pages, see function `featurePages`. Unlike a loop of `getFeatureByIndex`, which materializes the list up to each index, the server work is linear.
+	
+	Parameters:
+		eeFeatColl:
+			Type: ee.FeatureCollection object
+		pageSize: features per page
+			Type: integer
+			Default: 1000
+		prefetch: if True, fetch the next page in a background thread while the current one is consumed
+			Type: boolean
+			Default: True
+	Yields:
+		feature dictionary with keys of 'type', 'geometry', 'properties' (and 'id')
+	'''
+	pages = featurePages(eeFeatColl, pageSize)
+	for page in prefetched(pages) if prefetch else pages:
+		yield from page
+
+def iterFeatures(eeFeatColl, pageSize=1000, prefetch=True):
+	'''Iterate features of an ee.FeatureCollection as ee.Feature objects built from fetched pages, see function `iterFeatureDicts`. Properties of a feature are also in the dictionary, ie, `feature.get(name).getInfo()` can be replaced by the dictionary without a round-trip.
+	
+	Parameters:
+		eeFeatColl, pageSize, prefetch: see function `iterFeatureDicts`
+	Yields:
+		tuple of (ee.Feature, feature dictionary)
+	'''
+	for featureDict in iterFeatureDicts(eeFeatColl, pageSize, prefetch):
+		yield ee.Feature(featureDict), featureDict
+
 #split a over-5000-object ee.FeatureCollection to some ee.FeatureCollection
 #return a python list conposed of ee.FeatureCollection
 def spitFeatureCollection(eeFeatColl, length, splitNumber = 4000):
@@ -119,23 +215,65 @@ def generateGridForGeometry(region, dx, dy):
 
 	return ee.FeatureCollection(cells)
 '''
-def generateGrid(xmin,ymin,xmax,ymax,dx,dy):
-	cells = ee.FeatureCollection([])
+#grids with more cells are built server-side by default, see function `generateGrid`
+gridClientCellsLimit = 5000
+
+def gridFeatureCollection(cells):
+	'''Build a flat ee.FeatureCollection of rectangles from a client-side list of cells, in one payload.
+	
+	Parameters:
+		cells: rows of [x1, y1, x2, y2], eg, by function `gridCells`
+			Type: numpy.ndarray, list
+	Returns:
+		ee.FeatureCollection
+	'''
+	return ee.FeatureCollection([ee.Feature(ee.Geometry.Rectangle(cell)) for cell in np.asarray(cells, dtype='float64').tolist()])
+
+def gridFeatureCollectionServerSide(xmin, ymin, dx, dy, xcells, ycells):
+	'''Build a flat ee.FeatureCollection of rectangles server-side by nested `ee.List.sequence`, the payload is constant-size whatever the number of cells.
+	
+	Parameters:
+		xmin, ymin: lower-left corner of the grid
+			Type: float
+		dx, dy: cell size
+			Type: float
+		xcells, ycells: numbers of cells in x and y
+			Type: integer
+	Returns:
+		ee.FeatureCollection, in the same order as function `gridCells`
+	'''
+	def column(i):
+		x = ee.Number(xmin).add(ee.Number(i).multiply(dx))
+		def cell(j):
+			y = ee.Number(ymin).add(ee.Number(j).multiply(dy))
+			return ee.Feature(ee.Geometry.Rectangle([x, y, x.add(dx), y.add(dy)]))
+		return ee.List.sequence(0, ycells - 1).map(cell)
+	return ee.FeatureCollection(ee.List.sequence(0, xcells - 1).map(column).flatten())
+
+def generateGrid(xmin,ymin,xmax,ymax,dx,dy,serverSide=None):
+	'''Generate a grid as a flat ee.FeatureCollection, cells are computed at once by `gridCells` instead of merging them one by one.
+	
+	Parameters:
+		xmin, ymin, xmax, ymax: extent
+			Type: float
+		dx, dy: cell size
+			Type: float
+		serverSide: if True, built by `gridFeatureCollectionServerSide`, or else by `gridFeatureCollection`; if None, server-side for over `gridClientCellsLimit` cells
+			Type: boolean
+			Default: None
+	Returns:
+		ee.FeatureCollection
+	'''
 	xmin,ymin,xmax,ymax,dx,dy = float(xmin),float(ymin),float(xmax),float(ymax),float(dx),float(dy)
-	xx = np.arange(xmin, xmax, dx) #range only for integer, np.arange works for float
-	yy = np.arange(ymin, ymax, dy)
-	for x in xx:
-		for y in yy:
-			coords = [x+0.0, y+0.0, x+dx, y+dy]
-			rect = ee.Algorithms.GeometryConstructors.Rectangle(coords)
-			rect = ee.FeatureCollection(ee.Feature(rect))
-			cells = cells.merge(rect)
-	return ee.FeatureCollection(cells)
+	xcells, ycells = len(np.arange(xmin, xmax, dx)), len(np.arange(ymin, ymax, dy))	#same as `gridCells`
+	if serverSide is None: serverSide = xcells * ycells > gridClientCellsLimit
+	if serverSide:
+		return gridFeatureCollectionServerSide(xmin, ymin, dx, dy, xcells, ycells)
+	return gridFeatureCollection(gridCells(xmin,ymin,xmax,ymax,dx,dy))
 
 #extend general grids 'multiple' rounds around
 #default 'ouput' is for extension part; if need all, then assign it 'all'
 def extendGrid(xmin,ymin,xmax,ymax,dx,dy,left=1,bottom=1,right=1,top=1,multiple=None,output='ex'):
-	cells = ee.FeatureCollection([])
 	xmin,ymin,xmax,ymax,dx,dy = float(xmin),float(ymin),float(xmax),float(ymax),float(dx),float(dy)
 	
 	if multiple and multiple >=0:
@@ -146,17 +284,8 @@ def extendGrid(xmin,ymin,xmax,ymax,dx,dy,left=1,bottom=1,right=1,top=1,multiple=
 	ymin_new = ymin - bottom * dy
 	ymax_new = ymax + top * dy
 	
-	xx = np.arange(xmin_new, xmax_new, dx) #range only for integer, np.arange works for float
-	yy = np.arange(ymin_new, ymax_new, dy)
-	for x in xx:
-		for y in yy:
-			if 'EX' in output.upper():
-				if xmin <= x < xmax and ymin <= y < ymax: continue
-			coords = [x, y, x + dx, y + dy]
-			rect = ee.Algorithms.GeometryConstructors.Rectangle(coords)
-			rect = ee.FeatureCollection(ee.Feature(rect))
-			cells = cells.merge(rect)
-	return ee.FeatureCollection(cells)
+	exclude = (xmin, ymin, xmax, ymax) if 'EX' in output.upper() else None
+	return gridFeatureCollection(gridCells(xmin_new,ymin_new,xmax_new,ymax_new,dx,dy,exclude=exclude))
 
 def gridThePlanet(dx, dy):
 	xmin, xmax, ymin, ymax = -180, 180, -90, 90		# coordinates of the planet
@@ -205,16 +334,38 @@ def featureCollectionGriddingByParts(eeFeatColl, parts):
 def addArea(feature):
   return feature.set({'area': feature.area(1e3)})
 
+def featureCollectionIntersection(featColl01, featColl02, maxError=1):
+	'''Return the intersection of two ee.FeatureCollection objects in a single server-side expression: features are paired by `ee.Join.saveAll` with a spatial `intersects` filter, then intersected by one `map` and `flatten`, so the expression does not grow with the number of features.
+	
+	Parameters:
+		featColl01:
+			Type: ee.FeatureCollection
+		featColl02: properties of its features are kept
+			Type: ee.FeatureCollection
+		maxError: maximum error tolerated by the filter, in meters
+			Type: float
+			Default: 1
+	Returns:
+		ee.FeatureCollection
+	'''
+	matchesKey = 'intersection_matches'
+	spatialFilter = ee.Filter.intersects(leftField='.geo', rightField='.geo', maxError=maxError)
+	joined = ee.Join.saveAll(matchesKey=matchesKey).apply(featColl01, featColl02, spatialFilter)
+	def featureIntersection(feature01):
+		feature01 = ee.Feature(feature01)
+		matches = ee.List(feature01.get(matchesKey))
+		return ee.FeatureCollection(matches.map(lambda feature02: ee.Feature(feature02).intersection(feature01)))
+	return joined.map(featureIntersection).flatten()
+
 #Return the intersection of two ee.FeatureCollection objects
 #Both input and return are ee.FeatureCollection
-def featureCollectionIntersection(featColl01,featColl02):
+#the legacy version, the expression grows with the number of features in featColl01, see `featureCollectionIntersection`
+def featureCollectionIntersectionLegacy(featColl01,featColl02):
 	featCollNew = ee.FeatureCollection([])
 	def featureIntersection(feature,featCollInit):
 		featureNew = feature.intersection(feature01)
 		return ee.FeatureCollection(featCollInit).merge(ee.FeatureCollection(featureNew))
-	lens = featColl01.size().getInfo()
-	for i in range(0,lens):
-		feature01 = getFeatureByIndex(featColl01,i)
+	for feature01, _ in iterFeatures(featColl01):
 		featColl02Slimmed = featColl02.filterBounds(feature01.geometry())
 		featCollNew02 = featColl02Slimmed.iterate(featureIntersection,ee.FeatureCollection([]))
 		featCollNew = featCollNew.merge(featCollNew02)
@@ -222,21 +373,61 @@ def featureCollectionIntersection(featColl01,featColl02):
 #the following cost much more runtime than the one above, due to using too many getInfo()
 def featureCollectionIntersection01(featColl01,featColl02):
 	featCollNew = ee.FeatureCollection([])
-	lens01 = featColl01.size().getInfo()
-	for i in range(0,lens01):
-		feature01 = getFeatureByIndex(featColl01,i)
+	for feature01, _ in iterFeatures(featColl01):
 		featColl02Slimmed = featColl02.filterBounds(feature01.geometry())
-		lens02 = featColl02Slimmed.size().getInfo()
-		for j in range(0,lens02):
-			feature02 = getFeatureByIndex(featColl02Slimmed,j)
+		for feature02, _ in iterFeatures(featColl02Slimmed):
 			feature = feature02.intersection(feature01)
 			featCollNew = featCollNew.merge(ee.FeatureCollection(feature))
 	return featCollNew
 #get download url for a talbe, only has geometry information
-def tableDownloadUrl(assetId,format):
+#works for asset ids and ee.FeatureCollection objects; all properties if selectors is None
+def tableDownloadUrl(assetId,format,selectors='.geo'):
 	table = ee.FeatureCollection(assetId)
-	url = table.getDownloadURL(filetype = format, selectors='.geo')
+	url = table.getDownloadURL(filetype = format, selectors=selectors)
 	return url
+
+def downloadTableByUrl(eeFeatColl, filename, filetype=None, selectors=None, chunkSize=1024**2, timeout=300):
+	'''Download a table through its download url, streaming the HTTP body to disk in chunks, without the 5000-feature cap and the in-memory response of `getInfo()`.
+	
+	The body is written to '<filename>.part', validated by `downloadIsSuccess`, then renamed to `filename`.
+	
+	Parameters:
+		eeFeatColl: asset id or table
+			Type: string, ee.FeatureCollection
+		filename: output filename
+			Type: string, pathlib.Path object
+		filetype: 'geojson' or 'csv' etc, guessed from the suffix of `filename` if None
+			Type: string
+			Default: None
+		selectors: properties to export, all if None, eg, '.geo' for geometries only
+			Type: string, list
+			Default: None
+		chunkSize: bytes of each chunk
+			Type: integer
+			Default: 1 MB
+		timeout: seconds of connecting and reading timeout
+			Type: float
+			Default: 300
+	Returns:
+		boolean
+	'''
+	filename = pathlib.Path(filename)
+	filetype = filetype if filetype else filename.suffix.lstrip('.').lower()
+	partFile = filename.with_name(filename.name + '.part')
+	try:
+		url = tableDownloadUrl(eeFeatColl, filetype, selectors)
+		with requests.get(url, stream=True, timeout=timeout) as response:
+			response.raise_for_status()
+			with open(partFile, 'wb') as f:
+				for chunk in response.iter_content(chunk_size=chunkSize):
+					f.write(chunk)
+		if downloadIsSuccess(partFile):
+			partFile.replace(filename)
+			return True
+	except Exception:
+		print('-'*60); traceback.print_exc(); print('-'*60)
+	if partFile.exists(): partFile.unlink()
+	return False
 #download an eeFeatColl as a geojson-format file with full information
 #works for ee.FeatureCollection, ee.Feature, and ee.Geometry
 def downloadTableToGeoJson(eeFeatColl,fileName):
@@ -247,56 +438,187 @@ def downloadTableToGeoJson(eeFeatColl,fileName):
 #download an eeFeatColl as a csv-format file with '.geo' information
 def downloadTableToCsv(eeFeatColl,fileName):
 	dict = eeFeatColl.getInfo()
-	features = dict['features']		#list
-	geometries = [feature['geometry'] for feature in features]
-	#write a header line
-	with open(fileName,'w') as f:
-		f.write('.geo')
-	for geometry in geometries:
-		text = '"' + json.dumps(geometry) + '"'
-		with open(fileName,'a+') as f:
-			f.write(f.read() + '\n' + text)
+	with tableWriter(fileNameCSV=fileName) as writer:
+		writer.writeFeatures(dict['features'])
+
+try:
+	import orjson
+	def jsonDumps(obj):
+		'''Serialize an object to a JSON string by `orjson`, a faster drop-in of `json.dumps` (compact separators).'''
+		return orjson.dumps(obj).decode('utf-8')
+except ImportError:
+	jsonDumps = json.dumps
+
+class tableWriter:
+	'''A streaming writer of features to a GeoJSON file and/or a '.geo' csv file in one pass, each file opened once.
+	
+	The csv framing is the same as before, ie, a '.geo' header line and one quoted geometry per line. JSON is serialized by `jsonDumps`, ie, by `orjson` if installed.
+	
+	Usage:
+		with tableWriter(fileNameGeoJson, fileNameCSV, header=dict) as writer:
+			writer.writeFeatures(dict['features'])
+	
+	Parameters:
+		fileNameGeoJson:
+			Type: string, pathlib.Path object
+			Default: None
+		fileNameCSV:
+			Type: string, pathlib.Path object
+			Default: None
+		header: other top-level members of the GeoJSON, eg, the result of `getInfo()`, whose 'features' are ignored
+			Type: dictionary
+			Default: None, {'type': 'FeatureCollection'}
+	'''
+	
+	def __init__(self, fileNameGeoJson=None, fileNameCSV=None, header=None):
+		self.count = 0
+		self.fileGeoJson = open(fileNameGeoJson, 'w') if fileNameGeoJson else None
+		self.fileCSV = open(fileNameCSV, 'w') if fileNameCSV else None
+		if self.fileGeoJson:
+			header = {key: value for key, value in (header if header else {'type': 'FeatureCollection'}).items() if key != 'features'}
+			self.fileGeoJson.write(jsonDumps(header)[:-1] + (', ' if header else '') + '"features": [')
+		if self.fileCSV:
+			self.fileCSV.write('.geo')	#write a header line
+	
+	def write(self, feature):
+		'''Write a feature dictionary.
+		'''
+		if self.fileGeoJson:
+			self.fileGeoJson.write((', ' if self.count else '') + jsonDumps(feature))
+		if self.fileCSV:
+			self.fileCSV.write('\n"' + jsonDumps(feature['geometry']) + '"')
+		self.count += 1
+	
+	def writeFeatures(self, features):
+		'''Write an iterable of feature dictionaries.
+		'''
+		for feature in features:
+			self.write(feature)
+	
+	def close(self, complete=True):
+		'''Close files, the GeoJSON is left without its closing brackets if not `complete`, eg, on errors, so that it is not a valid one.
+		'''
+		if self.fileGeoJson:
+			if complete: self.fileGeoJson.write(']}')
+			self.fileGeoJson.close()
+		if self.fileCSV:
+			self.fileCSV.close()
+		self.fileGeoJson = self.fileCSV = None
+	
+	def __enter__(self):
+		return self
+	
+	def __exit__(self, excType, excValue, excTraceback):
+		self.close(complete=excType is None)
+		return False
 
 #download an eeFeatColl as a custom format file
-#geojson(default), csv or both
+#geojson(default), csv or both, in one pass
 def downloadTable(eeFeatColl,fileNameGeoJson=None,fileNameCSV=None,filetype=None):
 	if not fileNameGeoJson and not fileNameCSV:
 		print('These is no output file')
 		return
 	dict = eeFeatColl.getInfo()
-	if fileNameGeoJson and ( not filetype or 'JSON' in filetype.upper()):
-		json_dict = json.dumps(dict)
-		with open(fileNameGeoJson,'w') as f:
-			f.write(json_dict)
-	if fileNameCSV and ( not filetype or 'CSV' in filetype.upper()):
-		features = dict['features']		#list
-		geometries = [feature['geometry'] for feature in features]
-		#write a header line
-		with open(fileNameCSV,'w') as f:
-			f.write('.geo')
-		for geometry in geometries:
-			text = '"' + json.dumps(geometry) + '"'
-			with open(fileNameCSV,'a+') as f:
-				f.write(f.read() + '\n' + text)
-
-#a wrapper for downloadTable to file, only for geojson-format at present
-def downloader4File(eeFeatColl,filename,attempts):
+	fileNameGeoJson = fileNameGeoJson if fileNameGeoJson and ( not filetype or 'JSON' in filetype.upper()) else None
+	fileNameCSV = fileNameCSV if fileNameCSV and ( not filetype or 'CSV' in filetype.upper()) else None
+	if 'features' not in dict:	#ee.Feature or ee.Geometry
+		if fileNameGeoJson:
+			with open(fileNameGeoJson,'w') as f:
+				f.write(jsonDumps(dict))
+		return
+	with tableWriter(fileNameGeoJson, fileNameCSV, header=dict) as writer:
+		writer.writeFeatures(dict['features'])
+
+def downloadTableSharded(eeFeatColl, fileNameGeoJson=None, fileNameCSV=None, shardSize=4000, threads=8, attempts=3, backoff=2, seed=0):
+	'''Download a table of any size by auto-sharding: the size is got once, the table is split into shards of about `shardSize` features by ranges of a server-side random column, the shards are fetched by `getInfo()` in parallel, then merged into one GeoJSON and/or csv by `tableWriter` in streaming fashion. No `splitNumber` is needed as in `spitFeatureCollection`.
+	
+	Note that features are ordered by shard, not as in `eeFeatColl`. Files are written to '<filename>.part' and renamed after all shards succeeded; the partial files are removed if a shard failed after its retries, and the error is raised.
+	
+	Parameters:
+		eeFeatColl:
+			Type: ee.FeatureCollection
+		fileNameGeoJson, fileNameCSV: see function `downloadTable`
+		shardSize: expected features of each shard, kept below the 5000-feature cap of `getInfo()` with a margin for random sizes
+			Type: integer
+			Default: 4000
+		threads: number of shards in flight
+			Type: integer
+			Default: 8
+		attempts, backoff: retries of each shard, see function `downloaderPool`
+		seed: seed of the random column
+			Type: integer
+			Default: 0
+	Returns:
+		number of features written
+	'''
+	if not fileNameGeoJson and not fileNameCSV:
+		print('These is no output file')
+		return 0
+	eeFeatColl = ee.FeatureCollection(eeFeatColl)
+	size = eeFeatColl.size().getInfo()
+	shards = max(1, math.ceil(size / shardSize))
+	randomField = 'shard_random'
+	if shards > 1:
+		table = eeFeatColl.randomColumn(randomField, seed)
+		parts = [table.filter(ee.Filter.And(ee.Filter.gte(randomField, i / shards), ee.Filter.lt(randomField, (i + 1) / shards)))
+			for i in range(shards)]
+	else:
+		parts = [eeFeatColl]
+	
+	def fetch(part):
+		for attempt in range(1, attempts + 1):
+			try:
+				return part.getInfo()
+			except Exception as e:
+				if attempt == attempts: raise
+				print('Failed -- Download shard -- attempt %d -- %s' % (attempt, e))
+				time.sleep(backoff * 2 ** (attempt - 1) * random.uniform(0.5, 1.5))
+	
+	fileNames = [pathlib.Path(fileName) if fileName else None for fileName in (fileNameGeoJson, fileNameCSV)]
+	partFiles = [fileName.with_name(fileName.name + '.part') if fileName else None for fileName in fileNames]
+	pool = ThreadPool(max(1, min(threads, shards)))
+	writer = None
+	try:
+		for dict in pool.imap(fetch, parts):
+			if writer is None:
+				writer = tableWriter(*partFiles, header=dict)
+			for feature in dict['features']:
+				feature.get('properties', {}).pop(randomField, None)
+				writer.write(feature)
+		writer.close()
+	except BaseException:
+		if writer is not None: writer.close(complete=False)
+		for partFile in partFiles:
+			if partFile and partFile.exists(): partFile.unlink()
+		raise
+	finally:
+		pool.close()
+		pool.join()
+	for fileName, partFile in zip(fileNames, partFiles):
+		if partFile: partFile.replace(fileName)
+	print('Succeeded -- Download -- %d features in %d shards' % (writer.count, shards))
+	return writer.count
+
+#a wrapper for downloadTable (or `fetch`) to file, only for geojson-format at present
+def downloader4File(eeFeatColl,filename,attempts,fetch=None):
+	fetch = fetch if fetch else downloadTable
 	while attempts > 0:
-		downloadTable(eeFeatColl,filename)
+		fetch(eeFeatColl,filename)
 		#time.sleep(5)
 		if downloadIsSuccess(filename):
 			print('Succeeded -- Download -- %s' % pathlib.Path(filename).name)
 			attempts = 0
 		else:
-			pathlib.Path(filename).unlink()	#remove file if failed-download
+			if pathlib.Path(filename).exists(): pathlib.Path(filename).unlink()	#remove file if failed-download
 			attempts = attempts - 1
 			if attempts == 0:
-				print('Failed -- Download -- ' % pathlib.Path(filename).name)
+				print('Failed -- Download -- %s' % pathlib.Path(filename).name)
 
-#a wrapper for downloadTable to zipfile, only for geojson-format at present
-def downloader4Zip(eeFeatColl,filename,zipFile,attempts):
+#a wrapper for downloadTable (or `fetch`) to zipfile, only for geojson-format at present
+def downloader4Zip(eeFeatColl,filename,zipFile,attempts,fetch=None):
+	fetch = fetch if fetch else downloadTable
 	while attempts > 0:
-		downloadTable(eeFeatColl,filename)
+		fetch(eeFeatColl,filename)
 		#time.sleep(5)
 		if downloadIsSuccess(filename):
 			comp_re = compress2zip(filename,zipFile,str(filename)[-12:])
@@ -307,9 +629,9 @@ def downloader4Zip(eeFeatColl,filename,zipFile,attempts):
 			attempts = attempts - 1
 			if attempts == 0:
 				print('Failed -- Download -- %s' % pathlib.Path(filename).name)
-		pathlib.Path(filename).unlink()		#remove file after compress or faided-download
+		if pathlib.Path(filename).exists(): pathlib.Path(filename).unlink()		#remove file after compress or faided-download
 
-def downloader(eeFeatColl, filename, zipFile=None, attempts=3):
+def downloader(eeFeatColl, filename, zipFile=None, attempts=3, streamed=False):
 	'''A wrapper for downloader4File, downloader4Zip, only for geojson-format at present.
 	- only for table
 	- only for `EPSG:4326`
@@ -327,11 +649,88 @@ def downloader(eeFeatColl, filename, zipFile=None, attempts=3):
 		attempts: 
 			Type: integer
 			Default: 3
+		streamed: if True, stream the table through its download url by `downloadTableByUrl`, or else fetch it by `getInfo()`
+			Type: boolean
+			Default: False
 	'''
+	fetch = downloadTableByUrl if streamed else downloadTable
 	if not zipFile:
-		downloader4File(eeFeatColl,filename,attempts)
+		downloader4File(eeFeatColl,filename,attempts,fetch)
 	else:
-		downloader4Zip(eeFeatColl,filename,zipFile,attempts)
+		downloader4Zip(eeFeatColl,filename,zipFile,attempts,fetch)
+
+def downloaderPool(jobs, zipFile=None, threads=8, attempts=3, backoff=2, fetch=None, progress=True):
+	'''A bounded-concurrency download manager, fetching `threads` tables at once with per-job retries and exponential backoff; only appending to `zipFile` is serialized.
+	
+	Parameters:
+		jobs: pairs of table and `.geojson` filename, see function `downloader`
+			Type: list of tuple (ee.FeatureCollection, string or pathlib.Path)
+		zipFile: if assigned, downloaded files are moved into it, see function `downloader4Zip`
+			Type: string, pathlib.Path object
+			Default: None
+		threads: number of downloads in flight
+			Type: integer
+			Default: 8
+		attempts: attempts of each job
+			Type: integer
+			Default: 3
+		backoff: seconds to wait before the 2nd attempt, doubled for each further attempt, with a random jitter
+			Type: float
+			Default: 2
+		fetch: function of (eeFeatColl, filename) to download a table, eg, a `getDownloadURL`-based one; `downloadTable` (`getInfo`) if None
+			Type: function
+			Default: None
+		progress: if True, print progress and throughput after each job
+			Type: boolean
+			Default: True
+	Returns:
+		List of dictionaries, one for each job, with keys of 'filename', 'success', 'attempts', 'seconds', 'bytes'
+	'''
+	fetch = fetch if fetch else downloadTable
+	zipLock, progressLock = threading.Lock(), threading.Lock()
+	start = time.time()
+	counter = {'done': 0, 'failed': 0, 'bytes': 0}
+	
+	def job(eeFeatColl, filename):
+		filename = pathlib.Path(filename)
+		jobStart = time.time()
+		success, size = False, 0
+		for attempt in range(1, attempts + 1):
+			try:
+				fetch(eeFeatColl, filename)
+				success = downloadIsSuccess(filename)
+			except Exception as e:
+				print('Failed -- Download -- %s -- attempt %d -- %s' % (filename.name, attempt, e))
+				success = False
+			if success:
+				size = filename.stat().st_size
+				if zipFile:
+					with zipLock:
+						success = compress2zip(filename, zipFile, str(filename)[-12:])
+					filename.unlink()
+				if success: break
+			elif filename.exists():
+				filename.unlink()	#remove file if failed-download
+			if attempt < attempts:
+				time.sleep(backoff * 2 ** (attempt - 1) * random.uniform(0.5, 1.5))
+		print('%s -- Download -- %s' % ('Succeeded' if success else 'Failed', filename.name))
+		with progressLock:
+			counter['done'] += 1
+			counter['failed'] += 0 if success else 1
+			counter['bytes'] += size
+			if progress:
+				elapsed = max(time.time() - start, 1e-9)
+				print('Progress -- %d/%d jobs, %d failed -- %.2f jobs/s, %.2f MB/s' % (
+					counter['done'], len(jobs), counter['failed'], counter['done'] / elapsed, counter['bytes'] / 1024**2 / elapsed))
+		return {'filename': str(filename), 'success': success, 'attempts': attempt, 'seconds': time.time() - jobStart, 'bytes': size}
+	
+	pool = ThreadPool(max(1, min(threads, len(jobs))))
+	try:
+		results = pool.starmap(job, jobs)
+	finally:
+		pool.close()
+		pool.join()
+	return results
 
 def parseGeometriesFromZip(zipObject, fileNameGeoJson):
 	'''parse .geo data from geojson in zip to a list
@@ -412,48 +811,17 @@ def calculateArea(feature, reference, threshold = 5e9):
 		area = grids.map(lambda f: f.set({'area': f.area(1e3)})).aggregate_sum('area')
 	return area
 
-def adjustFeatureDict4csv(featureDict, geometry = '.geo', properties = None):
-	'''Customize original nested dictionary to a dictionary which can be save to geocsv directly.
-	
-	Parameters:
-		featureDict: the original nested dictionary
-			Type: dictionary (nested)
-		geometry: optinal, field for geometry, it is a must for geocsv file. Although it can be ignored be set to other assignment.
-			Type: string
-			Default: '.geo', is equivalent to 'None'
-		properties: optional, need all then assign 'all'
-			Type: string, list
-			Default: None
-	Returns:
-		Dictionary
+def iterFeatureDictsFromGeoJsonInZip(fileNameZip, fileNameGeoJson, geometry = '.geo', properties = None):
+	'''An iterator version of `parseFeatureDictsFromGeoJsonInZip`, see function `iterFeatureDictsFromGeoJson`.
 	'''
-	newdict = {}
-	if properties:
-		if isinstance(properties, str):
-			if 'ALL' in properties.upper():
-				newdict.update(featureDict['properties'])
-			else:
-				try:
-					newdict[properties] = featureDict['properties'][properties]
-				except:
-					print('Warning -- check keyword "%s"' % properties)
-		elif isinstance(properties, list):
-			for property in properties:
-				try:
-					newdict[property] = featureDict['properties'][property]
-				except:
-					print('-'*60); traceback.print_exc(); print('-'*60)
-					print('Warning -- check keyword "%s" in list "properties"' % property)
-	
-	if not geometry or geometry == '.geo':
-		if featureDict['geometry'] ==  None:	#'null' will be 'None' in python
-			newdict[geometry] = ''
-		else:
-			newdict[geometry] = json.dumps(featureDict['geometry'])
-	else:
-		print('Warning -- check keyword "%s"' % geometry)
-	
-	return newdict
+	@contextlib.contextmanager
+	def opener():
+		#open a file in a zipfile object
+		with zfile(fileNameZip) as myzip:
+			with myzip.open(fileNameGeoJson) as f:
+				yield f
+	for feature in iterGeoJsonFeatures(opener, fileNameGeoJson):
+		yield adjustFeatureDict4csv(feature, geometry, properties)
 
 def parseFeatureDictsFromGeoJson(fileNameGeoJson, geometry = '.geo', properties = None):
 	'''	Get the original nested dictionary for ee.Feature(s) from input geojson file, then convert to direct-dictionary for geocsv by invoking 'adjustFeatureDict4csv' function.
@@ -466,14 +834,9 @@ def parseFeatureDictsFromGeoJson(fileNameGeoJson, geometry = '.geo', properties
 	Returns:
 		List or Boolean/False
 	'''
-	with open(fileNameGeoJson) as f:
-		geodict = json.loads(f.read())
-	if geodict['type'] == 'FeatureCollection':
-		features = geodict['features']		#list
-		return [adjustFeatureDict4csv(feature, geometry, properties) for feature in features]
-	elif geodict['type'] == 'Feature':
-		return [adjustFeatureDict4csv(geodict, geometry, properties)]
-	else:
+	try:
+		return list(iterFeatureDictsFromGeoJson(fileNameGeoJson, geometry, properties))
+	except ValueError:
 		print('Failed -- Parsing -- check "type" in %s' % fileNameGeoJson)
 		return False
 
@@ -490,20 +853,21 @@ def parseFeatureDictsFromGeoJsonInZip(fileNameZip, fileNameGeoJson, geometry = '
 	Returns:
 		List or Boolean/False
 	'''
-
-	#open a file in a zipfile object
-	with zfile(fileNameZip) as myzip:
-		with myzip.open(fileNameGeoJson) as f:
-			geodict = json.loads(f.read())
-	if geodict['type'] == 'FeatureCollection':
-		features = geodict['features']		#list
-		return [adjustFeatureDict4csv(feature, geometry, properties) for feature in features]
-	elif geodict['type'] == 'Feature':
-		return [adjustFeatureDict4csv(geodict, geometry, properties)]
-	else:
+	try:
+		return list(iterFeatureDictsFromGeoJsonInZip(fileNameZip, fileNameGeoJson, geometry, properties))
+	except ValueError:
 		print('Failed -- Parsing -- check "type" in %s' % fileNameGeoJson)
 		return False
 
+def iterFeatureDictsFromGeoJsons(fileNamesGeoJson, geometry = '.geo', properties = None):
+	'''Chain `iterFeatureDictsFromGeoJson` of files, files failed parsing are skipped.
+	'''
+	for file in fileNamesGeoJson:
+		try:
+			yield from iterFeatureDictsFromGeoJson(file, geometry, properties)
+		except ValueError:
+			print('Failed -- Parsing -- check "type" in %s' % file)
+
 def writeFeatureDicts2csv(features, fileNameCSV):
 	'''	Write a list of featureDicts to a geocsv file. See `writeLogsDicts2csv` in longspyfuncs module.
 	
@@ -543,14 +907,63 @@ def sortDictList(dictList, sortField=None, sortReverse=False, addSortOrder=False
 		dictList.sort(key = lambda d: d[sortField], reverse = sortReverse)
 		if addSortOrder:
 			field_order = addSortOrder if isinstance(addSortOrder, str) else '%s_order' % sortField
-			for d in dictList: d[field_order] = dictList.index(d)
+			for i, d in enumerate(dictList): d[field_order] = i
 	except:
 		print('-'*60); traceback.print_exc(); print('-'*60)
 		print('Warning -- sorting failed -- function "sortDictList"')
 	finally: return dictList
 	
+def geojson2csvParallel(fileNamesGeoJson, fileNameCSV, geometry = '.geo', properties = None,
+	sortField=None, sortReverse=False, addSortOrder=False, processes=None):
+	'''A parallel version of `geojson2csv` for a list of files: each file is parsed and converted to a csv shard in a process pool, then shards are concatenated in order, or k-way merged by `heapq.merge` if `sortField` is assigned. The output, including the order and `addSortOrder`, is the same as the serial one; it falls back to the serial one if headers of files differ, or a shard failed.
+	The worker `geojson2csvShard` lives in `lots.util`, which does not import `ee`, so the pool works with the default start method, eg, 'spawn', without `ee.Initialize()` in every worker.
+	
+	Parameters:
+		fileNamesGeoJson: input filenames
+			Type: list of strings, pathlib.PosixPath objects
+		fileNameCSV, geometry, properties, sortField, sortReverse, addSortOrder: see function `geojson2csv`
+		processes: number of processes, `os.cpu_count()` if None
+			Type: integer
+			Default: None
+	Returns:
+		Boolean
+	'''
+	from multiprocessing import Pool
+	fileNameCSV = pathlib.Path(fileNameCSV)
+	with tempfile.TemporaryDirectory(dir=fileNameCSV.parent) as folder:
+		shards = [pathlib.Path(folder) / ('shard%06d.csv' % i) for i in range(len(fileNamesGeoJson))]
+		with Pool(processes) as pool:
+			headers = pool.starmap(geojson2csvShard, [(file, shard, geometry, properties, sortField, sortReverse)
+				for file, shard in zip(fileNamesGeoJson, shards)])
+		parts = [(shard, header) for shard, header in zip(shards, headers) if header is not None]
+		if not parts: return
+		header = parts[0][1]
+		field_order = (addSortOrder if isinstance(addSortOrder, str) else '%s_order' % sortField) if sortField and addSortOrder else None
+		if (any(h is False or h != header for _, h in parts) or (sortField and sortField not in header)
+			or (field_order and field_order in header)):
+			print('Warning -- falling back to the serial conversion -- function "geojson2csvParallel"')
+			return geojson2csv(fileNamesGeoJson, fileNameCSV, geometry, properties, sortField, sortReverse, addSortOrder)
+		
+		exists = fileIsValid(fileNameCSV)
+		with open(fileNameCSV, 'a' if exists else 'w', newline='') as f:
+			writer = csv.writer(f)
+			if not exists: writer.writerow(header + ([field_order] if field_order else []))
+			if not sortField:
+				for shard, _ in parts:
+					with open(shard, newline='') as fs:
+						shutil.copyfileobj(fs, f)
+				return True
+			files = [open(shard, newline='') for shard, _ in parts]
+			try:
+				rows = [((json.loads(row[0]), row[1:]) for row in csv.reader(fs)) for fs in files]
+				for i, (_, row) in enumerate(heapq.merge(*rows, key = lambda t: t[0], reverse = sortReverse)):	#stable, earlier files first for ties
+					writer.writerow(row + [i] if field_order else row)
+			finally:
+				for fs in files: fs.close()
+		return True
+
 def geojson2csv(fileNameGeoJson, fileNameCSV, geometry = '.geo', properties = None,
-	sortField=None, sortReverse=False, addSortOrder=False):
+	sortField=None, sortReverse=False, addSortOrder=False, processes=None):
 	'''A wrapper to convert ee.Feature(s) from geojson file(s) to a geocsv file.
 	
 	Parameters:
@@ -561,20 +974,21 @@ def geojson2csv(fileNameGeoJson, fileNameCSV, geometry = '.geo', properties = No
 		geometry: see function 'adjustFeatureDict4csv'
 		properties: see function 'adjustFeatureDict4csv'
 		sortField, sortReverse, addSortOrder: see function 'sortDictList'
+		processes: if assigned, files are converted in a process pool by `geojson2csvParallel`
+			Type: integer
+			Default: None
 	Returns:
 		Boolean
 	'''
-	if isinstance(fileNameGeoJson, (str, pathlib.PosixPath)):
-		features = parseFeatureDictsFromGeoJson(fileNameGeoJson, geometry, properties)
-	elif isinstance(fileNameGeoJson, list):
-		features = []
-		for file in fileNameGeoJson:
-			features_part = parseFeatureDictsFromGeoJson(file, geometry, properties)
-			if features_part:
-				features = features + features_part
+	files = fileNameGeoJson if isinstance(fileNameGeoJson, list) else [fileNameGeoJson]
+	if processes and len(files) > 1:
+		return geojson2csvParallel(files, fileNameCSV, geometry, properties, sortField, sortReverse, addSortOrder, processes)
+	features = iterFeatureDictsFromGeoJsons(files, geometry, properties)
+	if not sortField:
+		return writeLogsDicts2csvStreamed(fileNameCSV, features)	#streamed, in constant memory
+	features = list(features)
 	if features:
-		if sortField:
-			features = sortDictList(features, sortField=sortField, sortReverse=sortReverse, addSortOrder=addSortOrder)
+		features = sortDictList(features, sortField=sortField, sortReverse=sortReverse, addSortOrder=addSortOrder)
 		return writeFeatureDicts2csv(features, fileNameCSV)
 
 def geojsonInZip2csv(fileNameZip, fileNameGeoJson, fileNameCSV, geometry = '.geo', 
@@ -594,10 +1008,16 @@ def geojsonInZip2csv(fileNameZip, fileNameGeoJson, fileNameCSV, geometry = '.geo
 	Returns:
 		Boolean
 	'''
+	if not sortField:
+		def features():
+			try:
+				yield from iterFeatureDictsFromGeoJsonInZip(fileNameZip, fileNameGeoJson, geometry, properties)
+			except ValueError:
+				print('Failed -- Parsing -- check "type" in %s' % fileNameGeoJson)
+		return writeLogsDicts2csvStreamed(fileNameCSV, features())	#streamed, in constant memory
 	features = parseFeatureDictsFromGeoJsonInZip(fileNameZip, fileNameGeoJson, geometry, properties)
 	if features:
-		if sortField:
-			features = sortDictList(features, sortField=sortField, sortReverse=sortReverse, addSortOrder=addSortOrder)
+		features = sortDictList(features, sortField=sortField, sortReverse=sortReverse, addSortOrder=addSortOrder)
 		return writeFeatureDicts2csv(features, fileNameCSV)
 
 def exportTable2Asset(eeFeatColl, assetId, properties=None, overwrite=True, wait=True):
@@ -1181,18 +1601,17 @@ def table2image(eeFeatColl, boundary=None, pixelValues=None, pixelField=None, pi
 
 	image = ee.Image(0)
 	pixelValues_new = []
-	for i in range(lens):
+	for i, (feat, featDict) in enumerate(iterFeatures(eeFeatColl)):
 		potential_region = ee.Image(image).eq(0)
-		feat = getFeatureByIndex(eeFeatColl, i )
 		feat_fc = ee.FeatureCollection(feat)	#target feature in ee.FeatureCollection form
 		if pixelValues:
 			pixelValue = pixelValues[i]
 		elif pixelField and not pixelPrefix:
-			pixelValue = feat.get(pixelField).getInfo() + base_pixelField
+			pixelValue = featDict['properties'][pixelField] + base_pixelField
 		elif pixelPrefix and not pixelField:
 			pixelValue = base_pixelPrefix + i + 1
 		elif pixelPrefix and pixelField:
-			pixelValue = base_pixelPrefix + feat.get(pixelField).getInfo() + base_pixelField
+			pixelValue = base_pixelPrefix + featDict['properties'][pixelField] + base_pixelField
 		else:
 			pixelValue = i + 1	#feature index + 1, can not be 0
 		pixelValues_new.append(pixelValue)
@@ -1328,7 +1747,7 @@ def downloadIsSuccess(filename):
 	filename = pathlib.Path(filename)
 	if fileIsValid(filename):
 		with open(filename) as f:
-			firstRecord = f.readline().rstrip()
+			firstRecord = f.readline(64).rstrip()	#bounded, a GeoJSON download is a single line
 		fileSize = filename.stat().st_size
 		if fileSize >= 50 and firstRecord != 'Internal Earth Engine error.':
 			return True
@@ -5,23 +5,183 @@
 **
 * Geoprocessing in Python
 """
-import geopandas as gpd
 import numpy as np
-
-import shapely
-from shapely.ops import voronoi_diagram as svd
-from shapely.ops import transform
-from shapely.geometry import Point, Polygon, MultiPolygon
-from osgeo import gdal, gdal_array
 from collections import Counter
-import pyproj
-import rioxarray as rxr
 
-import pathlib, subprocess, time, traceback, os, sys
+import functools, pathlib, subprocess, threading, time, traceback, os, sys
+
+from .util import fileIsValid, gridCells, lazyImport, writeLogsDicts2csv
+
+#heavy dependencies are imported at their first use, see function `lazyImport`
+gpd = lazyImport('geopandas')
+shapely = lazyImport('shapely')
+shapely_geometry = lazyImport('shapely.geometry')	#submodules apart, `shapely` may be imported already without them
+shapely_ops = lazyImport('shapely.ops')
+gdal = lazyImport('osgeo.gdal')
+gdal_array = lazyImport('osgeo.gdal_array')
+ogr = lazyImport('osgeo.ogr')
+osr = lazyImport('osgeo.osr')
+pyproj = lazyImport('pyproj')
+rxr = lazyImport('rioxarray')
+
+#names kept for `from lots.gis import ...`, resolved by module `__getattr__`
+lazyNames = {
+	'svd': ('shapely.ops', 'voronoi_diagram'),
+	'transform': ('shapely.ops', 'transform'),
+	'Point': ('shapely.geometry', 'Point'),
+	'Polygon': ('shapely.geometry', 'Polygon'),
+	'MultiPolygon': ('shapely.geometry', 'MultiPolygon'),
+	'voronoiDiagram4plg': ('longsgis.longsgis', 'voronoiDiagram4plg'),
+	'dropHolesBase': ('longsgis.longsgis', 'dropHolesBase'),
+	'dropHoles': ('longsgis.longsgis', 'dropHoles'),
+	}
+
+def __getattr__(name):
+	if name not in lazyNames:
+		raise AttributeError("module '%s' has no attribute '%s'" % (__name__, name))
+	import importlib
+	moduleName, attr = lazyNames[name]
+	value = getattr(importlib.import_module(moduleName), attr)
+	globals()[name] = value
+	return value
+
+#instrumentation: records of instrumented calls are sent to registered sinks, see function `instrumentation`
+instrumentationSinks = []
+instrumentationDepth = [0]	#instrumented calls in flight, peak memory is measured by the outermost one only
+instrumentationLock = threading.Lock()
+
+class csvSink:
+	'''An instrumentation sink appending records to a csv-format file by `writeLogsDicts2csv`.
+	
+	Parameters:
+		fileName: output filename
+			Type: string, pathlib.PosixPath
+	'''
+	
+	def __init__(self, fileName):
+		self.fileName = fileName
+		self.lock = threading.Lock()
+	
+	def __call__(self, record):
+		with self.lock:
+			writeLogsDicts2csv(self.fileName, record)
+
+class collectorSink:
+	'''An instrumentation sink keeping records in memory, in `records`.
+	'''
+	
+	def __init__(self):
+		self.records = []
+		self.lock = threading.Lock()
+	
+	def __call__(self, record):
+		with self.lock:
+			self.records.append(record)
 
-from .util import fileIsValid
+class instrumentation:
+	'''A context manager registering an instrumentation sink, eg,
+		with instrumentation(csvSink('logs.csv')):
+			stateVector('tile.tif')
+	
+	Parameters:
+		sink: any callable accepting a record (dictionary), eg, `csvSink`, `collectorSink`
+			Type: callable
+		traceMemory: if True, `tracemalloc` is started (if not yet) to record peak memory allocated by Python per call; memory allocated by GDAL is not traced
+			Type: boolean
+			Default: True
+	'''
+	
+	def __init__(self, sink, traceMemory=True):
+		self.sink = sink
+		self.traceMemory = traceMemory
+		self.startedTracing = False
+	
+	def __enter__(self):
+		import tracemalloc
+		if self.traceMemory and not tracemalloc.is_tracing():
+			tracemalloc.start()
+			self.startedTracing = True
+		instrumentationSinks.append(self.sink)
+		return self.sink
+	
+	def __exit__(self, *exc):
+		import tracemalloc
+		instrumentationSinks.remove(self.sink)
+		if self.startedTracing: tracemalloc.stop()
+		return False
 
-from longsgis.longsgis import voronoiDiagram4plg, dropHolesBase, dropHoles
+def processIO():
+	'''Bytes read and written by this process so far, from `/proc/self/io` (Linux only), including reads served by the page cache.
+	
+	Returns:
+		tuple of (rchar, wchar), or (None, None) if unavailable
+	'''
+	try:
+		with open('/proc/self/io') as f:
+			counters = dict(line.split(':') for line in f)
+		return int(counters['rchar']), int(counters['wchar'])
+	except (OSError, KeyError, ValueError):
+		return None, None
+
+def childrenTime():
+	'''CPU time (user + system) of terminated and waited-for subprocesses so far.
+	
+	Returns:
+		float in seconds, or None if unavailable (Windows)
+	'''
+	try:
+		import resource
+	except ImportError:
+		return None
+	usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+	return usage.ru_utime + usage.ru_stime
+
+def instrumented(func):
+	'''A decorator recording wall time, CPU time, subprocess time, bytes read and written, and peak memory of each call, then sending the record to all registered sinks. It costs nothing but a check if no sink is registered.
+	
+	Bytes and subprocess time are process-wide counters, so concurrent calls in threads are counted together; bytes read or written by subprocesses are not counted.
+	Peak memory is process-wide too, so it is measured by the outermost of nested or concurrent calls only, eg, `gdalVectorize` but not the `gdalBinarize` it invokes, and it is None for others; it needs `tracemalloc.reset_peak` of Python 3.9+, and is None on older versions.
+	'''
+	@functools.wraps(func)
+	def wrapper(*args, **kwargs):
+		if not instrumentationSinks: return func(*args, **kwargs)
+		import tracemalloc
+		with instrumentationLock:
+			outermost = instrumentationDepth[0] == 0
+			instrumentationDepth[0] += 1
+		tracing = outermost and tracemalloc.is_tracing() and hasattr(tracemalloc, 'reset_peak')
+		if tracing: tracemalloc.reset_peak()
+		read0, written0 = processIO()
+		children0 = childrenTime()
+		cpu0, wall0 = time.process_time(), time.perf_counter()
+		error = ''
+		try:
+			return func(*args, **kwargs)
+		except Exception as e:
+			error = type(e).__name__
+			raise
+		finally:
+			wall, cpu = time.perf_counter() - wall0, time.process_time() - cpu0
+			peak = tracemalloc.get_traced_memory()[1] if tracing else None
+			with instrumentationLock:
+				instrumentationDepth[0] -= 1
+			children1 = childrenTime()
+			read1, written1 = processIO()
+			record = {
+				'function': func.__name__,
+				'input': str(args[0]) if args else '',
+				'time': time.strftime('%Y-%m-%d %H:%M:%S'),
+				'wallTime': wall,
+				'cpuTime': cpu,
+				'subprocessTime': children1 - children0 if children0 is not None else None,
+				'bytesRead': read1 - read0 if read0 is not None else None,
+				'bytesWritten': written1 - written0 if written0 is not None else None,
+				'peakMemory': peak,
+				'error': error,
+				}
+			for sink in list(instrumentationSinks):
+				sink(record)
+	return wrapper
 
 def assignNodataValue(rasterFile, noDataValue):
 	'''Assign a specified nodata value by invoking `gdal_edit`.
@@ -42,6 +202,7 @@ def assignNodataValue(rasterFile, noDataValue):
 				]
 	subprocess.run(command)
 
+@instrumented
 def gdalBinarize(inputRaster, outputRaster, specifiedPixel, noDataValue=0):
 	'''Binarizing a specifid pixel value (land use type etc) in a source raster image by invoking `gdal_calc`.
 	
@@ -70,7 +231,8 @@ def gdalBinarize(inputRaster, outputRaster, specifiedPixel, noDataValue=0):
 				]
 	subprocess.run(command)
 
-def gdalVectorize(inputRaster, outputVector, specifiedPixel):
+@instrumented
+def gdalVectorize(inputRaster, outputVector, specifiedPixel, direct=False):
 	'''Vectorize a specifid pixel value (land use type etc) in a source raster image by invoking `gdal_calc` and `gdal_polygonize`.
 	
 	Parameters:
@@ -80,7 +242,12 @@ def gdalVectorize(inputRaster, outputVector, specifiedPixel):
 			Type: string, pathlib.PosixPath
 		specifiedPixel: specified pixel to polygonize
 			Type: digit, or string of digit	
+		direct: if `True`, polygonize in-process by invoking `gdalPolygonize`, without the temporary binarized raster; the `DN` field is then the pixel value instead of 1
+			Type: boolean
+			Default: False
 	'''
+	if direct:
+		return gdalPolygonize(inputRaster, outputVector, specifiedPixel)
 	inputRaster = pathlib.Path(inputRaster)
 	outputVector = pathlib.Path(outputVector)
 	if fileIsValid(outputVector): pathlib.Path(outputVector).unlink()
@@ -103,6 +270,68 @@ def gdalVectorize(inputRaster, outputVector, specifiedPixel):
 	except:
 		print('-'*60); traceback.print_exc(); print('-'*60)
 
+def gdalPolygonize(inputRaster, outputVector, specifiedPixels, vectorDriver='GeoJSON', fieldName='DN', bandNumber=1, connectedness=4, blockRows=None):
+	'''Vectorize specifid pixel values (land use types etc) in a source raster image in one pass by invoking `gdal.Polygonize` in-process.
+	
+	The mask of specified pixels is built block by block in an in-memory band, and the source band is polygonized through it, so the pixel value of each polygon is written to `fieldName`.
+	
+	Parameters:
+		inputRaster:
+			Type: string, pathlib.PosixPath
+		outputVector:
+			Type: string, pathlib.PosixPath
+		specifiedPixels: specified pixel(s) to polygonize
+			Type: digit, string of digit, or list of them
+		vectorDriver: format to export, https://gdal.org/drivers/vector/index.html
+			Type: string
+			Default: 'GeoJSON'
+		fieldName: field for pixel values
+			Type: string
+			Default: 'DN'
+		bandNumber:
+			Type: integer
+			Default: 1
+		connectedness: 4 or 8
+			Type: integer
+			Default: 4
+		blockRows: rows of each block when building the mask
+			Type: integer
+			Default: None, 256 rows at least
+	'''
+	inputRaster = str(pathlib.Path(inputRaster).resolve())
+	outputVector = pathlib.Path(outputVector)
+	if fileIsValid(outputVector): pathlib.Path(outputVector).unlink()
+	specifiedPixels = specifiedPixels if isinstance(specifiedPixels, (list, tuple)) else [specifiedPixels]
+	specifiedPixels = [float(pixel) for pixel in specifiedPixels]
+	
+	rasterData = gdal.Open(inputRaster)
+	band = rasterData.GetRasterBand(bandNumber)
+	xsize, ysize = band.XSize, band.YSize
+	
+	#mask of specified pixels
+	maskData = gdal.GetDriverByName('MEM').Create('', xsize, ysize, 1, gdal.GDT_Byte)
+	maskData.SetGeoTransform(rasterData.GetGeoTransform())
+	maskData.SetProjection(rasterData.GetProjection())
+	maskBand = maskData.GetRasterBand(1)
+	if not blockRows:
+		blockHeight = band.GetBlockSize()[1]
+		blockRows = blockHeight * max(1, 256 // blockHeight)
+	for yoff in range(0, ysize, blockRows):
+		rows = min(blockRows, ysize - yoff)
+		block = band.ReadAsArray(0, yoff, xsize, rows)
+		maskBand.WriteArray(np.isin(block, specifiedPixels).astype('uint8'), 0, yoff)
+	
+	#polygonize
+	vectorData = ogr.GetDriverByName(vectorDriver).CreateDataSource(str(outputVector))
+	srs = rasterData.GetSpatialRef()
+	layer = vectorData.CreateLayer(outputVector.stem, srs=srs, geom_type=ogr.wkbPolygon)
+	layer.CreateField(ogr.FieldDefn(fieldName, ogr.OFTInteger))
+	options = ['8CONNECTED=8'] if connectedness == 8 else []
+	result = gdal.Polygonize(band, maskBand, layer, 0, options)
+	vectorData = None	# flush
+	assert result == 0
+
+@instrumented
 def gdalRasterize(inputVector, outputRaster, attributeField):
 	'''Burns vector geometries into a raster by invoking `gdal_rasterize`.
 	
@@ -130,7 +359,149 @@ def gdalRasterize(inputVector, outputRaster, attributeField):
 				]
 	subprocess.run(command)
 
-def calcArea(inputVector, outputVector, vectorDriver='GeoJSON', crs='EPSG:4326', areaThreshold=0, sortAscending=False):
+def gdalRasterizeTiled(inputVector, outputRaster, attributeField=None, burnValue=1, resolution=None, bounds=None, crs=None, template=None,
+	outputType='Int16', noDataValue=0, allTouched=False, mergeAlg='REPLACE', tileSize=2048, threads=4, creationOptions=['COMPRESS=LZW']):
+	'''Burns vector geometries into a raster in-process, tile by tile in a thread pool by invoking `gdal.RasterizeLayer`, and export a cloud-optimized GeoTIFF.
+	
+	The target grid is the one of `template`, or built from `resolution`, `bounds` and `crs`.
+	
+	Parameters:
+		inputVector:
+			Type: string, pathlib.PosixPath
+		outputRaster: a cloud-optimized GeoTIFF
+			Type: string, pathlib.PosixPath
+		attributeField: specified field to be used for a burn-in value; `burnValue` is used if None
+			Type: string
+			Default: None
+		burnValue:
+			Type: digit
+			Default: 1
+		resolution: pixel size, in units of `crs`; a must if no `template`
+			Type: float, or list of two floats
+			Default: None
+		bounds: xmin, ymin, xmax, ymax in `crs`; extent of the vector layer if None
+			Type: list of four floats
+			Default: None
+		crs: crs of the output; crs of the vector layer if None
+			Type: string of 'EPSG:****'
+			Default: None
+		template: a raster whose grid (size, geotransform and crs) is used
+			Type: string, pathlib.PosixPath
+			Default: None
+		outputType: GDAL data type
+			Type: string
+			Default: 'Int16'
+		noDataValue: nodata and initial value of the output
+			Type: digit
+			Default: 0
+		allTouched: burn all pixels touched by geometries, not only those whose center is inside
+			Type: boolean
+			Default: False
+		mergeAlg: 'REPLACE' or 'ADD'
+			Type: string
+			Default: 'REPLACE'
+		tileSize: size of tiles, in pixels
+			Type: integer
+			Default: 2048
+		threads: size of the thread pool
+			Type: integer
+			Default: 4
+		creationOptions: creation options of the COG driver
+			Type: list
+			Default: ['COMPRESS=LZW']
+	'''
+	from multiprocessing.dummy import Pool as ThreadPool
+	
+	inputVector = str(pathlib.Path(inputVector).resolve())
+	outputRaster = pathlib.Path(outputRaster)
+	if fileIsValid(outputRaster): outputRaster.unlink()
+	
+	vectorData = ogr.Open(inputVector)
+	layer = vectorData.GetLayer()
+	layerSrs = layer.GetSpatialRef()
+	layerWkt = layerSrs.ExportToWkt() if layerSrs else None
+	
+	#target grid
+	if template:
+		templateData = gdal.Open(str(pathlib.Path(template).resolve()))
+		geotr = templateData.GetGeoTransform()
+		projection = templateData.GetProjection()
+		xsize, ysize = templateData.RasterXSize, templateData.RasterYSize
+		templateData = None
+	else:
+		assert resolution, '"resolution" is a must if no "template"'
+		xres, yres = (resolution, resolution) if not isinstance(resolution, (list, tuple)) else resolution
+		projection = pyproj.CRS(crs).to_wkt() if crs else layerWkt
+		if bounds:
+			xmin, ymin, xmax, ymax = bounds
+		else:
+			xmin, xmax, ymin, ymax = layer.GetExtent()
+			if crs and layerWkt and not pyproj.CRS(crs).equals(pyproj.CRS(layerWkt)):
+				xs, ys = transformPoints(layerWkt, crs, [xmin, xmin, xmax, xmax], [ymin, ymax, ymin, ymax])
+				xmin, ymin, xmax, ymax = xs.min(), ys.min(), xs.max(), ys.max()
+		xsize, ysize = int(np.ceil((xmax - xmin) / xres)), int(np.ceil((ymax - ymin) / yres))
+		geotr = (xmin, xres, 0., ymax, 0., -yres)
+	sameCrs = not (projection and layerWkt) or pyproj.CRS(projection).equals(pyproj.CRS(layerWkt))
+	vectorData = layer = None
+	
+	#intermediate tiled raster
+	tempRaster = str(outputRaster.with_name('temp%s.tif' % str(int(time.time()*1e6))))
+	dataType = gdal.GetDataTypeByName(outputType)
+	outData = gdal.GetDriverByName('GTiff').Create(tempRaster, xsize, ysize, 1, dataType,
+		options=['TILED=YES', 'COMPRESS=LZW', 'BIGTIFF=IF_SAFER'])
+	outData.SetGeoTransform(geotr)
+	outData.SetProjection(projection)
+	outBand = outData.GetRasterBand(1)
+	outBand.SetNoDataValue(noDataValue)
+	
+	options = ['ALL_TOUCHED=TRUE' if allTouched else 'ALL_TOUCHED=FALSE', 'MERGE_ALG=%s' % mergeAlg.upper()]
+	if attributeField: options.append('ATTRIBUTE=%s' % attributeField)
+	local = threading.local()
+	lock = threading.Lock()
+	
+	def rasterizeTile(window):
+		xoff, yoff, width, height = window
+		if not hasattr(local, 'layer'):
+			local.vectorData = ogr.Open(inputVector)
+			local.layer = local.vectorData.GetLayer()
+		tileGeotr = (geotr[0] + xoff * geotr[1], geotr[1], 0., geotr[3] + yoff * geotr[5], 0., geotr[5])
+		xmin, ymax = tileGeotr[0], tileGeotr[3]
+		xmax, ymin = xmin + width * geotr[1], ymax + height * geotr[5]
+		if not sameCrs:
+			xs, ys = transformPoints(projection, layerWkt, [xmin, xmin, xmax, xmax], [ymin, ymax, ymin, ymax])
+			xmin, ymin, xmax, ymax = xs.min(), ys.min(), xs.max(), ys.max()
+		local.layer.SetSpatialFilterRect(xmin, ymin, xmax, ymax)
+		
+		tileData = gdal.GetDriverByName('MEM').Create('', width, height, 1, dataType)
+		tileData.SetGeoTransform(tileGeotr)
+		tileData.SetProjection(projection)
+		tileData.GetRasterBand(1).Fill(noDataValue)
+		if attributeField:
+			gdal.RasterizeLayer(tileData, [1], local.layer, options=options)
+		else:
+			gdal.RasterizeLayer(tileData, [1], local.layer, burn_values=[burnValue], options=options)
+		array = tileData.ReadAsArray()
+		with lock:
+			outBand.WriteArray(array, xoff, yoff)
+	
+	windows = [(xoff, yoff, min(tileSize, xsize - xoff), min(tileSize, ysize - yoff))
+		for yoff in range(0, ysize, tileSize) for xoff in range(0, xsize, tileSize)]
+	try:
+		pool = ThreadPool(threads)
+		pool.map(rasterizeTile, windows)
+		pool.close()
+		pool.join()
+		outBand = outData = None	# flush
+		
+		#export a cloud-optimized GeoTIFF
+		outTile = gdal.Translate(str(outputRaster), tempRaster, format='COG', creationOptions=creationOptions)
+		assert outTile is not None
+		outTile = None
+	finally:
+		outBand = outData = None
+		if fileIsValid(tempRaster): pathlib.Path(tempRaster).unlink()
+
+def calcArea(inputVector, outputVector, vectorDriver='GeoJSON', crs='EPSG:4326', areaThreshold=0, sortAscending=False, engine=None, equalAreaCrs='EPSG:6933', chunkSize=None):
 	'''For a vector dataset, calculate area and add an `area` key/field, then sort it.
 	
 	Parameters:
@@ -150,7 +521,14 @@ def calcArea(inputVector, outputVector, vectorDriver='GeoJSON', crs='EPSG:4326',
 		sortAscending: ascending or descending when sorting
 			Type: boolean
 			Default: False
+		engine: if 'pyogrio', invoke `calcAreaArrow`, areas are calculated in `equalAreaCrs`
+			Type: string
+			Default: None
+		equalAreaCrs, chunkSize: see function `calcAreaArrow`
 	'''
+	if engine and engine.lower() == 'pyogrio':
+		return calcAreaArrow(inputVector, outputVector, vectorDriver=vectorDriver, crs=crs, areaThreshold=areaThreshold,
+			sortAscending=sortAscending, equalAreaCrs=equalAreaCrs, chunkSize=chunkSize)
 	inputVector = pathlib.Path(inputVector)
 	outputVector = pathlib.Path(outputVector)
 	
@@ -169,7 +547,83 @@ def calcArea(inputVector, outputVector, vectorDriver='GeoJSON', crs='EPSG:4326',
 	#export
 	vectors.to_file(outputVector, driver=vectorDriver)
 
-def bufferDissolve(gdf, distance, join_style=3):
+def calcAreaArrow(inputVector, outputVector, vectorDriver='GPKG', crs='EPSG:4326', areaThreshold=0, sortAscending=False, equalAreaCrs='EPSG:6933', chunkSize=None):
+	'''For a vector dataset, calculate area in an equal-area crs and add an `area` key/field, then sort it.
+	
+	Geometries are read through `pyogrio` as Arrow tables and areas are calculated by vectorized shapely functions, so it works for geographic crs (eg, 'EPSG:4326') too. Features are filtered by `areaThreshold` before re-projecting to `crs`.
+	
+	Parameters:
+		inputVector:
+			Type: string, pathlib.PosixPath
+		outputVector:
+			Type: string, pathlib.PosixPath
+		vectorDriver: format to export, compact ones like 'GPKG' or 'FlatGeobuf' are recommended (note 'FlatGeobuf' reorders features by its spatial index), https://gdal.org/drivers/vector/index.html
+			Type: string
+			Default: 'GPKG'
+		crs: coordinate reference system to export
+			Type: string
+			Default: 'EPSG:4326'
+		areaThreshold: minimum area (square meters) when filtering
+			Type: float, integer
+			Default: 0
+		sortAscending: ascending or descending when sorting; if None, do not sort, then features are written chunk by chunk
+			Type: boolean, None
+			Default: False
+		equalAreaCrs: crs to calculate area, default WGS 84 / NSIDC EASE-Grid 2.0 Global
+			Type: string
+			Default: 'EPSG:6933'
+		chunkSize: if assigned, read features in batches of `chunkSize`, for files bigger than memory
+			Type: integer
+			Default: None
+	'''
+	import pyogrio
+	inputVector = pathlib.Path(inputVector)
+	outputVector = pathlib.Path(outputVector)
+	if fileIsValid(outputVector): outputVector.unlink()
+	
+	def filteredBatches(batches, meta):
+		geometryName = meta['geometry_name'] or 'wkb_geometry'
+		crs_original = meta['crs']
+		for batch in batches:
+			geometries = shapely.from_wkb(batch.column(geometryName).to_numpy(zero_copy_only=False))
+			if crs_original:
+				areas = shapely.area(transformGeometries(crs_original, equalAreaCrs, geometries))
+			else:
+				areas = shapely.area(geometries)
+			keep = areas > areaThreshold	# `nan` for null geometries
+			yield geometries[keep], areas[keep], crs_original
+	
+	def export(geometries, areas, crs_original, append=False):
+		if crs_original and pyproj.CRS(crs_original) != pyproj.CRS(crs):
+			geometries = transformGeometries(crs_original, crs, geometries)
+		vectors = gpd.GeoDataFrame({'area': areas}, geometry=geometries, crs=crs)
+		pyogrio.write_dataframe(vectors, outputVector, driver=vectorDriver, append=append)
+	
+	if chunkSize:
+		with pyogrio.raw.open_arrow(inputVector, columns=[], batch_size=chunkSize, use_pyarrow=True) as (meta, reader):
+			if sortAscending is None:
+				appended = False
+				for geometries, areas, crs_original in filteredBatches(reader, meta):
+					if len(geometries) == 0: continue
+					export(geometries, areas, crs_original, append=appended)
+					appended = True
+				if not appended: export(np.empty(0, dtype=object), np.empty(0), meta['crs'])	#an empty layer
+				return
+			parts = list(filteredBatches(reader, meta))
+	else:
+		meta, table = pyogrio.read_arrow(inputVector, columns=[])
+		parts = list(filteredBatches([table], meta))
+	
+	if not parts: parts = [(np.empty(0, dtype=object), np.empty(0), meta['crs'])]	#no batches, eg, an empty layer
+	geometries = np.concatenate([part[0] for part in parts])
+	areas = np.concatenate([part[1] for part in parts])
+	crs_original = parts[0][2]
+	if sortAscending is not None:
+		order = np.argsort(areas if sortAscending else -areas, kind='stable')
+		geometries, areas = geometries[order], areas[order]
+	export(geometries, areas, crs_original)
+
+def bufferDissolve(gdf, distance, join_style=3, partitions=None, processes=None):
 	'''Create buffer and dissolve thoese intersects.
 	
 	Parameters:
@@ -177,78 +631,573 @@ def bufferDissolve(gdf, distance, join_style=3):
 			Type: geopandas.GeoDataFrame
 		distance: radius of the buffer
 			Type: float
+		join_style: join style of the buffer, 1 (round), 2 (mitre) or 3 (bevel)
+			Type: integer
+			Default: 3
+		partitions: if assigned, tile the extent and dissolve tiles in a process pool, see function `bufferDissolvePartitioned`
+			Type: integer, list of two integers
+			Default: None
+		processes: number of worker processes, `os.cpu_count()` if None
+			Type: integer
+			Default: None
 	Returns:
 		gdf_bf: buffered and dissolved GeoDataFrame
 			Type: geopandas.GeoDataFrame
 	'''
+	if partitions:
+		return bufferDissolvePartitioned(gdf, distance, join_style=join_style, partitions=partitions, processes=processes)
 	#create buffer and dissolve by invoking `unary_union`
-	smp = gdf.buffer(distance, join_style).unary_union
+	smp = gdf.buffer(distance, join_style=join_style).unary_union
 	#convert to GeoSeries and explode to single polygons
 	gs = gpd.GeoSeries([smp]).explode()
 	#convert to GeoDataFrame
 	gdf_bf = gpd.GeoDataFrame(geometry=gs, crs=gdf.crs).reset_index(drop=True)
 	return gdf_bf
 
-def gdal_clipByMask(inputRaster, outputRaster, mask):
-	'''Clipping / extracting a raster by mask.
+def unionParts(geometries):
+	'''Dissolve geometries and explode to single parts, a worker for `bufferDissolvePartitioned`.
+	
+	Parameters:
+		geometries:
+			Type: numpy.ndarray of shapely geometries
+	Returns:
+		numpy.ndarray of shapely geometries
+	'''
+	return shapely.get_parts(shapely.union_all(geometries))
+
+def bufferDissolvePartitioned(gdf, distance, join_style=3, partitions=4, processes=None):
+	'''Create buffer and dissolve thoese intersects in a spatially-partitioned and parallel way.
+	
+	The extent is split into `partitions` tiles and each buffered geometry goes to the tile containing the center of its bounds. Tiles are dissolved in a process pool, then only the dissolved parts crossing their tile border are re-unioned with the parts they intersect. The output covers the same area as `bufferDissolve`, but parts may come in another order.
+	
+	Parameters:
+		gdf, distance, join_style: see function `bufferDissolve`
+		partitions: tiles along x and y
+			Type: integer, list of two integers
+			Default: 4
+		processes: number of worker processes, `os.cpu_count()` if None
+			Type: integer
+			Default: None
+	Returns:
+		gdf_bf: buffered and dissolved GeoDataFrame
+			Type: geopandas.GeoDataFrame
+	'''
+	from multiprocessing import Pool
+	from scipy.sparse import coo_matrix
+	from scipy.sparse.csgraph import connected_components
+	
+	xparts, yparts = (partitions, partitions) if isinstance(partitions, int) else partitions
+	buffered = gdf.buffer(distance, join_style=join_style).values.to_numpy()
+	buffered = buffered[~shapely.is_empty(buffered)]
+	if len(buffered) == 0:
+		return gpd.GeoDataFrame(geometry=[], crs=gdf.crs)
+	
+	#assign geometries to tiles by the centers of their bounds
+	bounds = shapely.bounds(buffered)
+	xmin, ymin = bounds[:, 0].min(), bounds[:, 1].min()
+	xmax, ymax = bounds[:, 2].max(), bounds[:, 3].max()
+	dx = (xmax - xmin) / xparts or 1.
+	dy = (ymax - ymin) / yparts or 1.
+	ix = np.clip(((bounds[:, 0] + bounds[:, 2]) / 2 - xmin) // dx, 0, xparts - 1).astype(int)
+	iy = np.clip(((bounds[:, 1] + bounds[:, 3]) / 2 - ymin) // dy, 0, yparts - 1).astype(int)
+	tileIds = ix * yparts + iy
+	tiles = [buffered[tileIds == tileId] for tileId in np.unique(tileIds)]
+	boxes = [shapely.box(xmin + i * dx, ymin + j * dy, xmin + (i + 1) * dx, ymin + (j + 1) * dy)
+		for i, j in zip(np.unique(tileIds) // yparts, np.unique(tileIds) % yparts)]
+	
+	#dissolve each tile
+	with Pool(processes) as pool:
+		tileParts = pool.map(unionParts, tiles)
+	parts = np.concatenate(tileParts)
+	partTiles = np.repeat(np.arange(len(tileParts)), [len(p) for p in tileParts])
+	
+	#stitch seams -- only parts crossing or touching their tile border can intersect parts of other tiles
+	crossing = np.flatnonzero(~shapely.contains_properly(np.array(boxes, dtype=object)[partTiles], parts))
+	tree = shapely.STRtree(parts)
+	left, right = tree.query(parts[crossing], predicate='intersects')
+	left = crossing[left]
+	pairs = partTiles[left] != partTiles[right]
+	left, right = left[pairs], right[pairs]
+	graph = coo_matrix((np.ones(len(left)), (left, right)), shape=(len(parts), len(parts)))
+	_, labels = connected_components(graph, directed=False)
+	
+	groups = np.unique(labels, return_counts=True)
+	singles = np.isin(labels, groups[0][groups[1] == 1])
+	merged = [unionParts(parts[labels == label]) for label in groups[0][groups[1] > 1]]
+	geometries = np.concatenate([parts[singles]] + merged)
+	gdf_bf = gpd.GeoDataFrame(geometry=geometries, crs=gdf.crs).reset_index(drop=True)
+	return gdf_bf
+
+def rasterFiles(inputRaster):
+	'''Resolve a raster input, which is a file, a list of tiles or a glob pattern, to a list of files.
+	
+	Parameters:
+		inputRaster:
+			Type: string, pathlib.PosixPath, list of them, or string of glob pattern
+	Returns:
+		list of resolved filenames
+	'''
+	import glob
+	if isinstance(inputRaster, (list, tuple)):
+		return [str(pathlib.Path(f).resolve()) for f in inputRaster]
+	if not pathlib.Path(inputRaster).exists() and glob.has_magic(str(inputRaster)):
+		files = sorted(str(pathlib.Path(f).resolve()) for f in glob.glob(str(inputRaster)))
+		assert files, 'no raster matches %s' % inputRaster
+		return files
+	return [str(pathlib.Path(inputRaster).resolve())]
+
+class rasterCache:
+	'''A persistent on-disk cache (SQLite) for raster metadata and histograms, with LRU eviction under a size limit.
+	
+	Entries are keyed by `rasterCacheKey`, ie, path, size and modification time of raster files plus band and parameters, so a changed raster never hits.
+	
+	Parameters:
+		directory: where `rastercache.sqlite` is saved
+			Type: string, pathlib.PosixPath
+			Default: None, '~/.cache/lots'
+		maxSize: size limit of all entries, in bytes
+			Type: integer
+			Default: 256 MB
+	'''
+	
+	def __init__(self, directory=None, maxSize=256*1024**2):
+		directory = pathlib.Path(directory) if directory else pathlib.Path.home() / '.cache' / 'lots'
+		directory.mkdir(parents=True, exist_ok=True)
+		self.filename = directory / 'rastercache.sqlite'
+		self.maxSize = maxSize
+		with self.connect() as connection:
+			connection.execute('CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value BLOB, size INTEGER, accessed REAL)')
+	
+	def connect(self):
+		import sqlite3
+		return sqlite3.connect(str(self.filename), timeout=30)
+	
+	def get(self, key):
+		'''Return the cached value, or None.
+		'''
+		import pickle
+		with self.connect() as connection:
+			row = connection.execute('SELECT value FROM cache WHERE key = ?', (key,)).fetchone()
+			if row is None: return None
+			connection.execute('UPDATE cache SET accessed = ? WHERE key = ?', (time.time(), key))
+		return pickle.loads(row[0])
+	
+	def put(self, key, value):
+		'''Save a value, then evict the least recently used entries till all entries fit `maxSize`. Values larger than `maxSize` are not saved.
+		'''
+		import pickle
+		blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+		if len(blob) > self.maxSize: return False
+		with self.connect() as connection:
+			connection.execute('INSERT OR REPLACE INTO cache VALUES (?, ?, ?, ?)', (key, blob, len(blob), time.time()))
+			total = connection.execute('SELECT SUM(size) FROM cache').fetchone()[0]
+			for oldKey, size in connection.execute('SELECT key, size FROM cache ORDER BY accessed').fetchall():
+				if total <= self.maxSize: break
+				connection.execute('DELETE FROM cache WHERE key = ?', (oldKey,))
+				total -= size
+		return True
+	
+	def clear(self):
+		'''Remove all entries.
+		'''
+		with self.connect() as connection:
+			connection.execute('DELETE FROM cache')
+
+def rasterCacheKey(kind, inputRaster, **parameters):
+	'''Build a key of `rasterCache` from path, size and modification time of raster files, plus parameters, eg, band.
+	
+	Parameters:
+		kind: kind of entry, eg, 'stateVector'
+			Type: string
+		inputRaster: see function `rasterFiles`
+		parameters: others affecting the entry
+	Returns:
+		string
+	'''
+	import json
+	files = []
+	for f in rasterFiles(inputRaster):
+		stat = pathlib.Path(f).stat()
+		files.append([f, stat.st_size, stat.st_mtime_ns])
+	return json.dumps([kind, files, parameters], sort_keys=True, default=str)
+
+defaultRasterCache = None
+def getRasterCache(cache):
+	'''Resolve the `cache` parameter of raster functions.
+	
+	Parameters:
+		cache: `True` for a default `rasterCache` in '~/.cache/lots', `False`/None for no cache
+			Type: boolean, rasterCache
+	Returns:
+		rasterCache or None
+	'''
+	global defaultRasterCache
+	if isinstance(cache, rasterCache): return cache
+	if not cache: return None
+	if defaultRasterCache is None: defaultRasterCache = rasterCache()
+	return defaultRasterCache
+
+def rasterSource(inputRaster, inMemory=True):
+	'''Resolve a raster input, which is a file, a list of tiles or a glob pattern. Tiles are mosaicked into a lightweight VRT, so no merged raster is written.
 	
 	Parameters:
 		inputRaster:
+			Type: string, pathlib.PosixPath, list of them, or string of glob pattern
+		inMemory: build the VRT in `/vsimem/`; if `False`, write it to a temporary file, eg, for `rioxarray` which can NOT see `/vsimem/` of `osgeo.gdal`
+			Type: boolean
+			Default: True
+	Returns:
+		source: raster or VRT filename for GDAL
+			Type: string
+		tempVrt: the VRT to remove by `removeRasterSource` after using, None if not built
+			Type: string, None
+	'''
+	files = rasterFiles(inputRaster)
+	if len(files) == 1: return files[0], None
+	
+	if inMemory:
+		tempVrt = '/vsimem/mosaic%s.vrt' % str(int(time.time()*1e6))
+	else:
+		import tempfile
+		tempVrt = str(pathlib.Path(tempfile.gettempdir()) / ('mosaic%s.vrt' % str(int(time.time()*1e6))))
+	vrt = gdal.BuildVRT(tempVrt, files)
+	assert vrt is not None
+	vrt = None	# flush
+	return tempVrt, tempVrt
+
+def removeRasterSource(tempVrt):
+	'''Remove a VRT built by `rasterSource`.
+	'''
+	if not tempVrt: return
+	if tempVrt.startswith('/vsimem/'):
+		gdal.Unlink(tempVrt)
+	elif fileIsValid(tempVrt):
+		pathlib.Path(tempVrt).unlink()
+
+def overviewBand(band, scale=None):
+	'''Get the coarsest overview of a band whose pixel size is not larger than `scale`, eg, of a cloud-optimized GeoTIFF.
+	
+	Parameters:
+		band:
+			Type: osgeo.gdal.Band
+		scale: requested pixel size, in units of the raster crs
+			Type: float
+			Default: None
+	Returns:
+		band: the overview, or the input band if no overview fits
+			Type: osgeo.gdal.Band
+		factor: pixel size ratio between returned band and input band, in x and y
+			Type: tuple of float
+	'''
+	geotr = band.GetDataset().GetGeoTransform()
+	selected, factor = band, (1., 1.)
+	if not scale: return selected, factor
+	for i in range(band.GetOverviewCount()):
+		overview = band.GetOverview(i)
+		factorX, factorY = band.XSize / overview.XSize, band.YSize / overview.YSize
+		if abs(geotr[1]) * factorX <= scale * (1 + 1e-6) and factorX > factor[0]:
+			selected, factor = overview, (factorX, factorY)
+	return selected, factor
+
+def overviewLevel(rasterFile, scale=None):
+	'''Get the index of the coarsest overview whose pixel size is not larger than `scale`, as `overview_level` of `rioxarray.open_rasterio`.
+	
+	Parameters:
+		rasterFile:
 			Type: string, pathlib.PosixPath
+		scale: requested pixel size, in units of the raster crs
+			Type: float
+			Default: None
+	Returns:
+		integer or None
+	'''
+	import rasterio
+	if not scale: return None
+	with rasterio.open(rasterFile) as src:
+		resolution = abs(src.res[0])
+		levels = [i for i, factor in enumerate(src.overviews(1)) if resolution * factor <= scale * (1 + 1e-6)]
+	return levels[-1] if levels else None
+
+@instrumented
+def gdal_clipByMask(inputRaster, outputRaster, mask, cache=False):
+	'''Clipping / extracting a raster by mask.
+	
+	Parameters:
+		inputRaster: a raster, or tiles to mosaic, see function `rasterSource`
+			Type: string, pathlib.PosixPath, list of them, or string of glob pattern
 		outputRaster:
 			Type: string, pathlib.PosixPath
 		mask: 
 			Type: string, pathlib.PosixPath
+		cache: if enabled, skip clipping when the same raster and mask were clipped to `outputRaster` and it is unchanged, see function `getRasterCache`
+			Type: boolean, rasterCache
+			Default: False
 	'''
 	
-	inputRaster = str(pathlib.Path(inputRaster).resolve())
+	cache = getRasterCache(cache)
 	outputRaster = str(pathlib.Path(outputRaster).resolve())
 	mask = str(pathlib.Path(mask).resolve())
+	if cache:
+		key = rasterCacheKey('gdal_clipByMask', inputRaster, mask=rasterCacheKey('mask', mask), outputRaster=outputRaster)
+		if fileIsValid(outputRaster):
+			stat = pathlib.Path(outputRaster).stat()
+			if cache.get(key) == [stat.st_size, stat.st_mtime_ns]: return
 	
-	outTile = gdal.Warp(
-		srcDSOrSrcDSTab = inputRaster,
-		destNameOrDestDS = outputRaster,
-		cutlineDSName = mask,
-		cropToCutline = True
-		)
-	assert outTile is not None
+	inputRaster, tempVrt = rasterSource(inputRaster)
+	try:
+		outTile = gdal.Warp(
+			srcDSOrSrcDSTab = inputRaster,
+			destNameOrDestDS = outputRaster,
+			cutlineDSName = mask,
+			cropToCutline = True
+			)
+		assert outTile is not None
+		outTile = None	# flush
+	finally:
+		removeRasterSource(tempVrt)
+	if cache:
+		stat = pathlib.Path(outputRaster).stat()
+		cache.put(key, [stat.st_size, stat.st_mtime_ns])
 
-def stateVector(inputRaster, bandNumber=1):
-	'''Calculating a state vector of a categorized image.
+def memoryLayer(geometries, srs_wkt=None, values=None, fieldName='value'):
+	'''Build an in-memory OGR layer from shapely geometries, eg, for `gdal.RasterizeLayer`.
 	
 	Parameters:
-		inputRaster:
+		geometries:
+			Type: list or numpy.ndarray of shapely geometries
+		srs_wkt: spatial reference of geometries
+			Type: string of WKT
+			Default: None
+		values: if assigned, written to an integer field `fieldName`
+			Type: list or numpy.ndarray of integers
+			Default: None
+		fieldName:
+			Type: string
+			Default: 'value'
+	Returns:
+		datasource and layer, keep the datasource referenced while using the layer
+	'''
+	driver = ogr.GetDriverByName('Memory') or ogr.GetDriverByName('MEM')
+	datasource = driver.CreateDataSource('memoryLayer')
+	srs = None
+	if srs_wkt:
+		srs = osr.SpatialReference()
+		srs.ImportFromWkt(srs_wkt)
+	layer = datasource.CreateLayer('layer', srs=srs)
+	if values is not None:
+		layer.CreateField(ogr.FieldDefn(fieldName, ogr.OFTInteger64))
+	featureDefn = layer.GetLayerDefn()
+	for i, wkb in enumerate(shapely.to_wkb(np.asarray(geometries, dtype=object))):
+		feature = ogr.Feature(featureDefn)
+		feature.SetGeometry(ogr.CreateGeometryFromWkb(wkb))
+		if values is not None: feature.SetField(fieldName, int(values[i]))
+		layer.CreateFeature(feature)
+	return datasource, layer
+
+def rasterWindow(geotransform, bounds, rasterXSize, rasterYSize):
+	'''Get the pixel window of a north-up raster covering `bounds`.
+	
+	Parameters:
+		geotransform:
+			Type: tuple of 6 numbers
+		bounds: xmin, ymin, xmax, ymax
+			Type: tuple of 4 numbers
+		rasterXSize, rasterYSize: size of the raster
+			Type: integer
+	Returns:
+		xoff, yoff, xsize, ysize, or None if outside the raster
+	'''
+	xmin, ymin, xmax, ymax = bounds
+	col0 = max(int(np.floor((xmin - geotransform[0]) / geotransform[1])), 0)
+	col1 = min(int(np.ceil((xmax - geotransform[0]) / geotransform[1])), rasterXSize)
+	row0 = max(int(np.floor((ymax - geotransform[3]) / geotransform[5])), 0)
+	row1 = min(int(np.ceil((ymin - geotransform[3]) / geotransform[5])), rasterYSize)
+	if col1 <= col0 or row1 <= row0: return None
+	return col0, row0, col1 - col0, row1 - row0
+
+def gdal_clipByMasks(inputRaster, masks, outputDir=None, idField=None, threads=4, noDataValue=None, creationOptions=['COMPRESS=LZW']):
+	'''Clipping / extracting a raster by each feature of a vector layer.
+	
+	Masks intersected with the raster are found by a STRtree spatial index. For each mask, only the source window covering its bounds is read, then pixels outside the mask are set to nodata. Masks are processed in a thread pool, each thread holds its own dataset since GDAL releases the GIL while reading.
+	
+	Parameters:
+		inputRaster: a north-up raster
 			Type: string, pathlib.PosixPath
-		bandNumber:
+		masks: polygons, re-projected to crs of `inputRaster` if they are different
+			Type: string, pathlib.PosixPath, geopandas.GeoDataFrame
+		outputDir: if assigned, save each clip as `<id>.tif` in it; otherwise return in-memory arrays
+			Type: string, pathlib.PosixPath
+			Default: None
+		idField: field of `masks` used as id, index of `masks` if None
+			Type: string
+			Default: None
+		threads: size of the thread pool
 			Type: integer
-			Default: 1
+			Default: 4
+		noDataValue: nodata of output, nodata of `inputRaster` or 0 if None
+			Type: digit
+			Default: None
+		creationOptions: creation options for GeoTIFF outputs
+			Type: list
+			Default: ['COMPRESS=LZW']
 	Returns:
-		List of dictionaries
+		Dictionary, {id: output filename} or {id: (numpy.ndarray, geotransform)}
 	'''
+	from multiprocessing.dummy import Pool as ThreadPool
 	
 	inputRaster = str(pathlib.Path(inputRaster).resolve())
+	masks = masks if isinstance(masks, gpd.GeoDataFrame) else gpd.read_file(masks)
 	
-	# get the pixel size
 	rasterData = gdal.Open(inputRaster)
 	geotr = rasterData.GetGeoTransform()
-	pixelWidth, pixelHeight = abs(geotr[1]), abs(geotr[5])
-	unitArea = pixelHeight * pixelWidth
+	projection = rasterData.GetProjection()
+	rasterXSize, rasterYSize, bandCount = rasterData.RasterXSize, rasterData.RasterYSize, rasterData.RasterCount
+	dataType = rasterData.GetRasterBand(1).DataType
+	if noDataValue is None:
+		noDataValue = rasterData.GetRasterBand(1).GetNoDataValue()
+		noDataValue = 0 if noDataValue is None else noDataValue
+	rasterData = None
 	
-	# get the NoDataValue
-	band = rasterData.GetRasterBand(bandNumber)	# default '1'
-	noDataValue = band.GetNoDataValue()
+	if projection and masks.crs and not masks.crs.equals(pyproj.CRS(projection)):
+		masks = masks.to_crs(projection)
+	geometries = masks.geometry.values.to_numpy()
+	ids = masks[idField].values if idField else masks.index.values
+	
+	#masks intersected with the raster
+	xmin, xmax = geotr[0], geotr[0] + rasterXSize * geotr[1]
+	ymax, ymin = geotr[3], geotr[3] + rasterYSize * geotr[5]
+	index = np.sort(shapely.STRtree(geometries).query(shapely.box(xmin, ymin, xmax, ymax), predicate='intersects'))
+	
+	if outputDir:
+		outputDir = pathlib.Path(outputDir)
+		outputDir.mkdir(parents=True, exist_ok=True)
+	local = threading.local()
+	
+	def clip(i):
+		if not hasattr(local, 'rasterData'): local.rasterData = gdal.Open(inputRaster)
+		window = rasterWindow(geotr, shapely.bounds(geometries[i]), rasterXSize, rasterYSize)
+		if not window: return None
+		xoff, yoff, xsize, ysize = window
+		data = local.rasterData.ReadAsArray(xoff, yoff, xsize, ysize)
+		data = data.reshape((bandCount, ysize, xsize))
+		windowGeotr = (geotr[0] + xoff * geotr[1], geotr[1], 0., geotr[3] + yoff * geotr[5], 0., geotr[5])
+		
+		#rasterize the mask onto the window
+		maskData = gdal.GetDriverByName('MEM').Create('', xsize, ysize, 1, gdal.GDT_Byte)
+		maskData.SetGeoTransform(windowGeotr)
+		maskData.SetProjection(projection)
+		datasource, layer = memoryLayer([geometries[i]], projection)
+		gdal.RasterizeLayer(maskData, [1], layer, burn_values=[1])
+		outside = maskData.ReadAsArray() == 0
+		data[:, outside] = noDataValue
+		
+		if not outputDir: return ids[i], (data if bandCount > 1 else data[0], windowGeotr)
+		outputRaster = str(outputDir / ('%s.tif' % ids[i]))
+		outTile = gdal.GetDriverByName('GTiff').Create(outputRaster, xsize, ysize, bandCount, dataType, options=creationOptions)
+		outTile.SetGeoTransform(windowGeotr)
+		outTile.SetProjection(projection)
+		for b in range(bandCount):
+			band = outTile.GetRasterBand(b + 1)
+			band.SetNoDataValue(noDataValue)
+			band.WriteArray(data[b])
+		outTile = None
+		return ids[i], outputRaster
+	
+	pool = ThreadPool(threads)
+	results = pool.map(clip, index)
+	pool.close()
+	pool.join()
+	return dict(result for result in results if result)
+
+@instrumented
+def stateVector(inputRaster, bandNumber=1, scale=None, blockRows=None, cache=False, memmap=True):
+	'''Calculating a state vector of a categorized image.
+	
+	Parameters:
+		inputRaster: a raster, or tiles to mosaic, see function `rasterSource`
+			Type: string, pathlib.PosixPath, list of them, or string of glob pattern
+		bandNumber:
+			Type: integer
+			Default: 1
+		scale: if assigned, read the coarsest overview not coarser than it, see function `overviewBand`
+			Type: float
+			Default: None
+		blockRows: see function `readBlocks`
+			Type: integer
+			Default: None
+		cache: if enabled, geotransform, nodata and class histogram are saved to and loaded from it, see function `getRasterCache`
+			Type: boolean, rasterCache
+			Default: False
+		memmap: if True, pixels of an uncompressed and striped GeoTIFF are mapped rather than read, see function `mapBand`; others are read block by block
+			Type: boolean
+			Default: True
+	Returns:
+		List of dictionaries
+	'''
+	
+	cache = getRasterCache(cache)
+	cached = None
+	if cache:
+		key = rasterCacheKey('stateVector', inputRaster, bandNumber=bandNumber, scale=scale)
+		cached = cache.get(key)
+	if cached:
+		geotr, noDataValue, unitArea, pixelCount = cached['geotransform'], cached['noDataValue'], cached['unitArea'], cached['histogram']
+	else:
+		inputRaster, tempVrt = rasterSource(inputRaster)
+		try:
+			# get the pixel size
+			rasterData = gdal.Open(inputRaster)
+			geotr = rasterData.GetGeoTransform()
+			pixelWidth, pixelHeight = abs(geotr[1]), abs(geotr[5])
+			
+			# get the NoDataValue
+			band = rasterData.GetRasterBand(bandNumber)	# default '1'
+			noDataValue = band.GetNoDataValue()
+			band, factor = overviewBand(band, scale)
+			unitArea = pixelHeight * factor[1] * pixelWidth * factor[0]
+			
+			# count pixels block by block, blocks of a mapped band are views of the file
+			mapped = mapBand(band) if memmap and factor == (1, 1) else None
+			if mapped is None:
+				blocks = (block for block, in readBlocks([band], blockRows))
+			else:
+				blockRows = blockRows if blockRows else band.GetBlockSize()[1] * max(1, 256 // band.GetBlockSize()[1])
+				blocks = (mapped[yoff:yoff + blockRows] for yoff in range(0, mapped.shape[0], blockRows))
+			pixelCount = Counter()
+			for block in blocks:
+				classTypes, counts = np.unique(block, return_counts=True)
+				pixelCount.update(dict(zip(classTypes.tolist(), counts.tolist())))
+		finally:
+			rasterData = band = mapped = blocks = None
+			removeRasterSource(tempVrt)
+		if cache:
+			cache.put(key, {'geotransform': geotr, 'noDataValue': noDataValue, 'unitArea': unitArea, 'histogram': pixelCount})
 	
 	# calculate proportion
-	rasterArray = gdal_array.LoadFile(inputRaster)
-	pixelCount = dict(Counter(rasterArray.flatten()))
 	listPixel = [{'class': classType, 'area': counts * unitArea }
-		for classType, counts in pixelCount.items()
+		for classType, counts in sorted(pixelCount.items())
 		if classType != noDataValue ]
 	total = sum([item['area'] for item in listPixel])
 	for item in listPixel:
 		item['proportion'] = item['area'] / total
 	return listPixel
 
+@functools.lru_cache(maxsize=128)
+def cachedTransformer(crs_original, crs_target):
+	'''Get a `pyproj.Transformer` from original crs to target crs. Transformers are cached by (crs_original, crs_target), since constructing one costs milliseconds.
+	
+	Parameters:
+		crs_original:
+			Type: string of 'EPSG:****'
+		crs_target:
+			Type: string of 'EPSG:****'
+	Returns:
+		pyproj.Transformer
+	'''
+	crs0 = pyproj.CRS(crs_original)
+	crs1 = pyproj.CRS(crs_target)
+	return pyproj.Transformer.from_crs(crs0, crs1, always_xy=True)
+
 def transformPoint(crs_original, crs_target, pointCoords):
 	'''Transform a geometry of point from original crs to target crs.
 	
@@ -263,27 +1212,118 @@ def transformPoint(crs_original, crs_target, pointCoords):
 		List of updated coordinates.
 	'''
 	
-	pointCoords = Point(pointCoords)
-	crs0 = pyproj.CRS(crs_original)
-	crs1 = pyproj.CRS(crs_target)
-	project = pyproj.Transformer.from_crs(crs0, crs1, always_xy=True).transform
-	return list(transform(project, pointCoords).coords[0])
+	pointCoords = shapely_geometry.Point(pointCoords)
+	project = cachedTransformer(crs_original, crs_target).transform
+	return list(shapely_ops.transform(project, pointCoords).coords[0])
+
+def transformPoints(crs_original, crs_target, xs, ys):
+	'''Transform coordinates of points from original crs to target crs in one vectorized call.
+	
+	Parameters:
+		crs_original:
+			Type: string of 'EPSG:****'
+		crs_target:
+			Type: string of 'EPSG:****'
+		xs, ys: coordinates of points
+			Type: list, numpy.ndarray
+	Returns:
+		Two numpy.ndarray of updated x and y coordinates.
+	'''
+	xs = np.asarray(xs, dtype='float64')
+	ys = np.asarray(ys, dtype='float64')
+	return cachedTransformer(crs_original, crs_target).transform(xs, ys)
 
-def segmentedVolume(rasterFile, start = None, stop = None, step = None):
+def transformGeometries(crs_original, crs_target, geometries):
+	'''Transform geometries from original crs to target crs, all coordinates in one vectorized call.
+	
+	Parameters:
+		crs_original:
+			Type: string of 'EPSG:****'
+		crs_target:
+			Type: string of 'EPSG:****'
+		geometries:
+			Type: numpy.ndarray of shapely geometries
+	Returns:
+		numpy.ndarray of shapely geometries
+	'''
+	transformer = cachedTransformer(crs_original, crs_target)
+	return shapely.transform(geometries, lambda coords: np.column_stack(transformer.transform(coords[:, 0], coords[:, 1])))
+
+def transformGeoSeries(crs_original, crs_target, geoseries):
+	'''Transform a GeoSeries from original crs to target crs. Points are transformed by `transformPoints`, other geometries by `to_crs`.
+	
+	Parameters:
+		crs_original:
+			Type: string of 'EPSG:****'
+		crs_target:
+			Type: string of 'EPSG:****'
+		geoseries:
+			Type: geopandas.GeoSeries
+	Returns:
+		geopandas.GeoSeries
+	'''
+	if len(geoseries) and (geoseries.geom_type == 'Point').all():
+		xs, ys = transformPoints(crs_original, crs_target, geoseries.x.values, geoseries.y.values)
+		return gpd.GeoSeries(gpd.points_from_xy(xs, ys), index=geoseries.index, crs=crs_target)
+	return geoseries.set_crs(crs_original, allow_override=True).to_crs(crs_target)
+
+def segmentedVolumeBlock(block, stages):
+	'''Partial elevation-area and elevation-volume contributions of a block of elevations.
+	
+	Parameters:
+		block: elevations of a block, `nan` for nodata
+			Type: numpy.ndarray
+		stages: elevations to segment
+			Type: numpy.ndarray
+	Returns:
+		counts: number of cells below each stage
+			Type: numpy.ndarray
+		depths: sum of water depth (stage - elevation) of those cells for each stage
+			Type: numpy.ndarray
+	'''
+	data = np.asarray(block, dtype='float64').ravel()
+	data = np.sort(data[~np.isnan(data)])
+	cumsum = np.concatenate(([0.], np.cumsum(data)))
+	counts = np.searchsorted(data, stages, side='left')	# cells with `stage - elevation > 0`
+	depths = counts * stages - cumsum[counts]
+	return counts, depths
+
+@instrumented
+def segmentedVolume(rasterFile, start = None, stop = None, step = None, chunks = None, scheduler = 'threads', scale = None, cache = False):
 	'''Calculate the elevation-area and elevation-volume curves.
 	
 	Parameters:
-		rasterFile:
-			Type: string, pathlib.PosixPath
+		rasterFile: a DEM, or tiles to mosaic, see function `rasterSource`
+			Type: string, pathlib.PosixPath, list of them, or string of glob pattern
 		start, stop, step: range and interval for elevation
 			Type: real, integer
+		chunks: if assigned, open the raster with dask chunks and reduce the per-chunk contributions, see `chunks` of `rioxarray.open_rasterio`; it works for DEMs larger than memory
+			Type: integer, tuple, dictionary, string ('auto')
+			Default: None
+		scheduler: dask scheduler used when `chunks` is assigned, one of 'threads', 'processes', 'synchronous'
+			Type: string
+			Default: 'threads'
+		scale: if assigned, read the coarsest overview not coarser than it, see function `overviewLevel`
+			Type: float
+			Default: None
+		cache: if enabled, the elevation histogram is saved to and loaded from it, then curves of any stages are calculated from it by `segmentedVolumeHistogram`; not used with `chunks`, see function `getRasterCache`
+			Type: boolean, rasterCache
+			Default: False
 	Returns:
 		List of updated coordinates.
 	'''
-	rasterFile = pathlib.Path(rasterFile)
-	dem = rxr.open_rasterio(rasterFile, masked=True).squeeze()
-	resolution0 = dem.rio.resolution()[0]	# edge length of grid
-	dem = dem.data
+	if chunks:
+		return segmentedVolumeChunked(rasterFile, start=start, stop=stop, step=step, chunks=chunks, scheduler=scheduler, scale=scale)
+	cache = getRasterCache(cache)
+	if cache:
+		return segmentedVolumeHistogram(rasterFile, start=start, stop=stop, step=step, scale=scale, cache=cache)
+	rasterFile, tempVrt = rasterSource(rasterFile, inMemory=False)
+	try:
+		dem = rxr.open_rasterio(rasterFile, masked=True, overview_level=overviewLevel(rasterFile, scale)).squeeze()
+		resolution0 = dem.rio.resolution()[0]	# edge length of grid
+		dem = dem.data
+	finally:
+		removeRasterSource(tempVrt)
 	data = dem[~np.isnan(dem)]
 	
 	start = start if start else data.min()
@@ -304,4 +1344,536 @@ def segmentedVolume(rasterFile, start = None, stop = None, step = None):
 		newData.append(line)
 	return newData
 
+def segmentedVolumeHistogram(rasterFile, start = None, stop = None, step = None, scale = None, cache = True, maxElevations = 1000000):
+	'''Histogram version of `segmentedVolume`. The elevation histogram (sorted unique elevations and counts) is loaded from `cache`, or calculated and saved, then area and volume of all stages are calculated from its cumulative sums.
+	
+	The histogram is exact, so results are the same as `segmentedVolume`, but it takes about 12 bytes per unique elevation. On DEMs of floats almost every elevation is unique, so histograms with more than `maxElevations` unique elevations are not saved, and the histogram is calculated at every call.
+	
+	Parameters:
+		rasterFile, start, stop, step, scale, cache: see function `segmentedVolume`
+		maxElevations: unique elevations of histograms to save at most
+			Type: integer
+			Default: 1000000
+	Returns:
+		List of dictionaries
+	'''
+	cache = getRasterCache(cache)
+	cached = None
+	if cache:
+		key = rasterCacheKey('segmentedVolume', rasterFile, scale=scale)
+		cached = cache.get(key)
+	if not cached:
+		source, tempVrt = rasterSource(rasterFile, inMemory=False)
+		try:
+			dem = rxr.open_rasterio(source, masked=True, overview_level=overviewLevel(source, scale)).squeeze()
+			cached = {'resolution': dem.rio.resolution(), 'noDataValue': dem.rio.encoded_nodata}
+			dem = dem.data
+		finally:
+			removeRasterSource(tempVrt)
+		cached['elevations'], cached['counts'] = np.unique(dem[~np.isnan(dem)], return_counts=True)
+		if cache and len(cached['elevations']) <= maxElevations: cache.put(key, cached)
+	
+	resolution0 = cached['resolution'][0]	# edge length of grid
+	elevations = cached['elevations']	# in dtype of the DEM, so default stages are the same as `segmentedVolume`
+	counts = cached['counts']
+	start = start if start else elevations.min()
+	stop = stop if stop else elevations.max()
+	step = step if step else (elevations.max() - elevations.min())/100.
+	stages = np.arange(start, stop + step, step)
+	
+	cumulativeCounts = np.concatenate(([0], np.cumsum(counts)))
+	cumulativeSums = np.concatenate(([0.], np.cumsum(elevations.astype('float64') * counts)))
+	index = np.searchsorted(elevations, stages, side='left')	# cells with `stage - elevation > 0`
+	areas = cumulativeCounts[index] * resolution0 * resolution0
+	volumes = (cumulativeCounts[index] * stages - cumulativeSums[index]) * resolution0 * resolution0
+	return [{'stage': stage, 'area': area, 'volume': volume} for stage, area, volume in zip(stages, areas, volumes)]
+
+def segmentedVolumeChunked(rasterFile, start = None, stop = None, step = None, chunks = 'auto', scheduler = 'threads', scale = None):
+	'''Chunked version of `segmentedVolume`. The DEM is opened lazily with dask chunks, then partial area and volume of all stages are calculated chunk by chunk by invoking `segmentedVolumeBlock` and summed up.
+	
+	Parameters:
+		rasterFile, start, stop, step, chunks, scheduler, scale: see function `segmentedVolume`
+	Returns:
+		List of dictionaries
+	'''
+	import dask
+	import dask.array as da
+	
+	rasterFile, tempVrt = rasterSource(rasterFile, inMemory=False)
+	try:
+		dem = rxr.open_rasterio(rasterFile, masked=True, chunks=chunks, overview_level=overviewLevel(rasterFile, scale)).squeeze()
+		resolution0 = dem.rio.resolution()[0]	# edge length of grid
+		unitArea = resolution0 * resolution0
+		dem = dem.data	# dask.array
+		
+		if not (start and stop and step):
+			minimum, maximum = dask.compute(da.nanmin(dem), da.nanmax(dem), scheduler=scheduler)
+			start = start if start else minimum
+			stop = stop if stop else maximum
+			step = step if step else (maximum - minimum)/100.
+		stages = np.arange(start, stop + step, step)
+		
+		#one task per chunk, each returns contributions of all stages
+		blocks = [dask.delayed(segmentedVolumeBlock)(block, stages) for block in dem.to_delayed().ravel()]
+		partials = dask.compute(*blocks, scheduler=scheduler)
+	finally:
+		removeRasterSource(tempVrt)
+	counts = sum(partial[0] for partial in partials)
+	depths = sum(partial[1] for partial in partials)
+	
+	newData = []
+	for stage, count, depth in zip(stages, counts, depths):
+		line = {
+					'stage': stage,
+					'area': count * unitArea,
+					'volume': depth * unitArea,
+				}
+		newData.append(line)
+	return newData
+
+def generateGridGdf(xmin, ymin, xmax, ymax, dx, dy, crs=None):
+	'''Generate a grid for a rectangle region as a GeoDataFrame, a local twin of `generateGrid` in `lots.gee`.
+	
+	Parameters:
+		xmin, ymin, xmax, ymax: bounds of the region
+			Type: float
+		dx, dy: size of cell
+			Type: float
+		crs: coordinate reference system of the grid
+			Type: string of 'EPSG:****'
+			Default: None
+	Returns:
+		geopandas.GeoDataFrame
+	'''
+	cells = gridCells(xmin, ymin, xmax, ymax, dx, dy)	# same order as `generateGrid`, x first
+	return gpd.GeoDataFrame(geometry=shapely.box(*cells.T), crs=crs)
+
+def geometryBounds(geometry):
+	'''Get bounds, crs and geometries of a shapely geometry, GeoSeries or GeoDataFrame.
+	
+	Returns:
+		tuple of (bounds, crs, numpy.ndarray of geometries)
+	'''
+	if isinstance(geometry, (gpd.GeoDataFrame, gpd.GeoSeries)):
+		return geometry.total_bounds, geometry.crs, geometry.geometry.values.to_numpy() if isinstance(geometry, gpd.GeoDataFrame) else geometry.values.to_numpy()
+	return shapely.bounds(geometry), None, np.array([geometry], dtype=object)
 
+def intersectingCells(grid, geometries):
+	'''Keep cells of a grid intersecting any of geometries, found by a `shapely.STRtree` of cells.
+	'''
+	index = np.unique(shapely.STRtree(grid.geometry.values.to_numpy()).query(geometries, predicate='intersects')[1])
+	return grid.iloc[index].reset_index(drop=True)
+
+def generateGridGdfForGeometry(geometry, dx, dy, crs=None, intersects=False):
+	'''Generate a grid covering a geometry as a GeoDataFrame, an offline twin of `generateGridForGeometry` in `lots.gee`, without the `getInfo()` round-trip for bounds.
+	
+	Parameters:
+		geometry:
+			Type: shapely geometry, geopandas.GeoSeries, geopandas.GeoDataFrame
+		dx, dy: size of cell
+			Type: float
+		crs: coordinate reference system of the grid, crs of `geometry` if None
+			Type: string of 'EPSG:****'
+			Default: None
+		intersects: if True, keep only cells intersecting `geometry`
+			Type: boolean
+			Default: False
+	Returns:
+		geopandas.GeoDataFrame
+	'''
+	(xmin, ymin, xmax, ymax), geometryCrs, geometries = geometryBounds(geometry)
+	xmin = xmin - 0.05 * dx		# add a 0.05dx distance buffer
+	xmax = xmax + 0.05 * dx
+	ymin = ymin - 0.05 * dy
+	ymax = ymax + 0.05 * dy
+	grid = generateGridGdf(xmin, ymin, xmax, ymax, dx, dy, crs=crs if crs else geometryCrs)
+	return intersectingCells(grid, geometries) if intersects else grid
+
+def generateGridGdfForGeometryByParts(geometry, parts, crs=None, intersects=False):
+	'''Split bounds of a geometry into parts as a GeoDataFrame, an offline twin of `generateGridForGeometryByParts` in `lots.gee`.
+	
+	Parameters:
+		geometry, crs, intersects: see function `generateGridGdfForGeometry`
+		parts: numbers of parts in x and y
+			Type: integer, list of one or two integers
+	Returns:
+		geopandas.GeoDataFrame
+	'''
+	if isinstance(parts, int):
+		xparts, yparts = parts, parts
+	elif isinstance(parts, (list, tuple)) and len(parts)==1:
+		xparts, yparts = parts[0], parts[0]
+	elif isinstance(parts, (list, tuple)) and len(parts)==2:
+		xparts, yparts = parts[0], parts[1]
+	
+	(xmin, ymin, xmax, ymax), geometryCrs, geometries = geometryBounds(geometry)
+	dx = (xmax - xmin)/xparts
+	dy = (ymax - ymin)/yparts
+	#enlarged boundary
+	xmin = xmin - 0.05 * dx			#add 0.05dx buffer
+	xmax = xmax + 0.05 * dx
+	ymin = ymin - 0.05 * dy
+	ymax = ymax + 0.05 * dy
+	dx = (xmax - xmin)/xparts
+	dy = (ymax - ymin)/yparts
+	#stop half a part early, so float steps of `numpy.arange` never add a part
+	grid = generateGridGdf(xmin, ymin, xmax - 0.5 * dx, ymax - 0.5 * dy, dx, dy, crs=crs if crs else geometryCrs)
+	return intersectingCells(grid, geometries) if intersects else grid
+
+def intersectionPairs(geometries01, geometries02, keepGeomType=True):
+	'''Intersect each geometry of `geometries01` with those of `geometries02` it intersects, a worker for `gdfIntersection`.
+	
+	Parameters:
+		geometries01, geometries02:
+			Type: numpy.ndarray of shapely geometries
+		keepGeomType: drop results of lower dimension than inputs, eg, lines shared by touching polygons
+			Type: boolean
+			Default: True
+	Returns:
+		index01, index02: positions of intersected pairs
+			Type: numpy.ndarray
+		intersections:
+			Type: numpy.ndarray of shapely geometries
+	'''
+	tree = shapely.STRtree(geometries02)
+	index01, index02 = tree.query(geometries01, predicate='intersects')
+	order = np.lexsort((index02, index01))
+	index01, index02 = index01[order], index02[order]
+	intersections = shapely.intersection(geometries01[index01], geometries02[index02])
+	valid = ~shapely.is_empty(intersections)
+	if keepGeomType:
+		dimension = np.minimum(shapely.get_dimensions(geometries01[index01]), shapely.get_dimensions(geometries02[index02]))
+		valid &= shapely.get_dimensions(intersections) >= dimension
+	return index01[valid], index02[valid], intersections[valid]
+
+def gdfIntersection(gdf01, gdf02, keepGeomType=True, chunkSize=None, processes=None):
+	'''Return the intersection of two GeoDataFrame objects, a local twin of `featureCollectionIntersection` in `lots.gee`.
+	
+	Each geometry in `gdf01` is intersected with the geometries in `gdf02` it intersects, candidates found by a STRtree spatial index.
+	
+	Parameters:
+		gdf01, gdf02: `gdf02` is re-projected to crs of `gdf01` if they are different
+			Type: geopandas.GeoDataFrame
+		keepGeomType: see function `intersectionPairs`
+			Type: boolean
+			Default: True
+		chunkSize: if assigned, split `gdf01` to chunks and intersect them in a process pool
+			Type: integer
+			Default: None
+		processes: number of worker processes, `os.cpu_count()` if None
+			Type: integer
+			Default: None
+	Returns:
+		geopandas.GeoDataFrame with attributes of both, duplicated fields are suffixed with '_1' and '_2'
+	'''
+	if gdf02.crs != gdf01.crs: gdf02 = gdf02.to_crs(gdf01.crs)
+	geometries01 = gdf01.geometry.values.to_numpy()
+	geometries02 = gdf02.geometry.values.to_numpy()
+	
+	if chunkSize and len(geometries01) > chunkSize:
+		from multiprocessing import Pool
+		starts = range(0, len(geometries01), chunkSize)
+		with Pool(processes) as pool:
+			results = pool.starmap(intersectionPairs,
+				[(geometries01[start:start + chunkSize], geometries02, keepGeomType) for start in starts])
+		index01 = np.concatenate([result[0] + start for start, result in zip(starts, results)])
+		index02 = np.concatenate([result[1] for result in results])
+		intersections = np.concatenate([result[2] for result in results])
+	else:
+		index01, index02, intersections = intersectionPairs(geometries01, geometries02, keepGeomType)
+	
+	attributes01 = gdf01.drop(columns=gdf01.geometry.name).iloc[index01].reset_index(drop=True)
+	attributes02 = gdf02.drop(columns=gdf02.geometry.name).iloc[index02].reset_index(drop=True)
+	attributes = attributes01.join(attributes02, lsuffix='_1', rsuffix='_2')
+	return gpd.GeoDataFrame(attributes, geometry=intersections, crs=gdf01.crs)
+
+def gdfClip(gdf, mask, chunkSize=None, processes=None):
+	'''Clip a GeoDataFrame by a mask. Geometries within the mask are kept as they are.
+	
+	Parameters:
+		gdf:
+			Type: geopandas.GeoDataFrame
+		mask: re-projected to crs of `gdf` if it is a GeoDataFrame or GeoSeries with a different crs
+			Type: geopandas.GeoDataFrame, geopandas.GeoSeries, shapely geometry
+		chunkSize: if assigned, clip chunks of intersected geometries in a process pool
+			Type: integer
+			Default: None
+		processes: number of worker processes, `os.cpu_count()` if None
+			Type: integer
+			Default: None
+	Returns:
+		geopandas.GeoDataFrame
+	'''
+	if isinstance(mask, (gpd.GeoDataFrame, gpd.GeoSeries)):
+		if mask.crs and gdf.crs and mask.crs != gdf.crs: mask = mask.to_crs(gdf.crs)
+		mask = mask.union_all() if hasattr(mask, 'union_all') else mask.unary_union
+	shapely.prepare(mask)
+	geometries = gdf.geometry.values.to_numpy()
+	index = np.sort(shapely.STRtree(geometries).query(mask, predicate='intersects'))
+	candidates = geometries[index]
+	within = shapely.within(candidates, mask)
+	clipped = candidates.copy()
+	
+	toClip = np.flatnonzero(~within)
+	if chunkSize and len(toClip) > chunkSize:
+		from multiprocessing import Pool
+		chunks = [candidates[toClip[start:start + chunkSize]] for start in range(0, len(toClip), chunkSize)]
+		with Pool(processes) as pool:
+			results = pool.starmap(shapely.intersection, [(chunk, mask) for chunk in chunks])
+		clipped[toClip] = np.concatenate(results)
+	else:
+		clipped[toClip] = shapely.intersection(candidates[toClip], mask)
+	
+	valid = ~shapely.is_empty(clipped)
+	gdf_clipped = gdf.iloc[index[valid]].copy()
+	gdf_clipped[gdf.geometry.name] = clipped[valid]
+	return gdf_clipped
+
+def gdfGridding(gdf, dx, dy, chunkSize=None, processes=None):
+	'''Split a GeoDataFrame by a grid, a local twin of `featureCollectionGridding` in `lots.gee`.
+	
+	Parameters:
+		gdf:
+			Type: geopandas.GeoDataFrame
+		dx, dy: size of cell
+			Type: float
+		chunkSize, processes: see function `gdfIntersection`
+	Returns:
+		geopandas.GeoDataFrame
+	'''
+	grid = generateGridGdfForGeometry(gdf, dx, dy, intersects=True)
+	return gdfIntersection(gdf, grid, chunkSize=chunkSize, processes=processes)
+
+def readBlocks(bands, blockRows=None):
+	'''Read aligned bands strip by strip.
+	
+	Parameters:
+		bands: bands with the same size
+			Type: list of osgeo.gdal.Band
+		blockRows: rows of each strip, the block height of the first band (at least 256 rows) if None
+			Type: integer
+			Default: None
+	Yields:
+		tuple of numpy.ndarray, one for each band
+	'''
+	xsize, ysize = bands[0].XSize, bands[0].YSize
+	if not blockRows:
+		blockHeight = bands[0].GetBlockSize()[1]
+		blockRows = blockHeight * max(1, 256 // blockHeight)
+	for yoff in range(0, ysize, blockRows):
+		rows = min(blockRows, ysize - yoff)
+		yield tuple(band.ReadAsArray(0, yoff, xsize, rows) for band in bands)
+
+def mapBand(band):
+	'''Map the pixels of a band in an uncompressed and striped GeoTIFF by `numpy.memmap` at its data offset, without copying them, so the OS page cache does the I/O.
+	
+	Strips of the band should be contiguous, ie, a single band or 'INTERLEAVE=BAND' file, which is checked by strip offsets in the 'TIFF' metadata domain.
+	
+	Parameters:
+		band:
+			Type: osgeo.gdal.Band
+	Returns:
+		numpy.memmap of shape (YSize, XSize), or None for other layouts, eg, compressed, tiled, pixel-interleaved, bit-packed, VRT or in-memory rasters
+	'''
+	rasterData = band.GetDataset()
+	if rasterData is None or rasterData.GetDriver().ShortName != 'GTiff': return None
+	fileList = rasterData.GetFileList() or []
+	if not fileList or not pathlib.Path(fileList[0]).is_file(): return None
+	structure = rasterData.GetMetadata('IMAGE_STRUCTURE') or {}
+	if structure.get('COMPRESSION', 'NONE') != 'NONE' or band.GetMetadataItem('NBITS', 'IMAGE_STRUCTURE'): return None
+	if rasterData.RasterCount > 1 and structure.get('INTERLEAVE') == 'PIXEL': return None
+	
+	xsize, ysize = band.XSize, band.YSize
+	blockWidth, blockHeight = band.GetBlockSize()
+	if blockWidth != xsize: return None	# tiled
+	dtype = np.dtype(gdal_array.GDALTypeCodeToNumericTypeCode(band.DataType))
+	stripBytes = blockHeight * xsize * dtype.itemsize
+	offset = band.GetMetadataItem('BLOCK_OFFSET_0_0', 'TIFF')
+	if not offset: return None
+	offset = int(offset)
+	for strip in range(1, (ysize + blockHeight - 1) // blockHeight):
+		if int(band.GetMetadataItem('BLOCK_OFFSET_0_%d' % strip, 'TIFF') or -1) != offset + strip * stripBytes: return None
+	
+	with open(fileList[0], 'rb') as f:
+		byteOrder = f.read(2)
+	dtype = dtype.newbyteorder('<' if byteOrder == b'II' else '>')
+	return np.memmap(fileList[0], dtype=dtype, mode='r', offset=offset, shape=(ysize, xsize))
+
+def zonalStatistics(inputRaster, zones, zoneField=None, categorical=True, bandNumber=1, blockRows=None):
+	'''Calculating statistics of a raster for each zone.
+	
+	Zones are rasterized once aligned to the raster grid, then the raster is streamed block by block and statistics of all zones are accumulated by `numpy.bincount`, or by `numpy.unique` of zone-class pairs if `categorical`, without any per-zone loop.
+	
+	Parameters:
+		inputRaster: a north-up raster
+			Type: string, pathlib.PosixPath
+		zones: polygons, re-projected to crs of `inputRaster` if they are different
+			Type: string, pathlib.PosixPath, geopandas.GeoDataFrame
+		zoneField: field of `zones` used as zone id, index of `zones` if None
+			Type: string
+			Default: None
+		categorical: if `True`, calculate area and proportion of each class (like `stateVector`) in each zone; if `False`, calculate count, sum, mean, min and max
+			Type: boolean
+			Default: True
+		bandNumber:
+			Type: integer
+			Default: 1
+		blockRows: see function `readBlocks`
+			Type: integer
+			Default: None
+	Returns:
+		List of dictionaries
+	'''
+	inputRaster = str(pathlib.Path(inputRaster).resolve())
+	zones = zones if isinstance(zones, gpd.GeoDataFrame) else gpd.read_file(zones)
+	
+	rasterData = gdal.Open(inputRaster)
+	geotr = rasterData.GetGeoTransform()
+	projection = rasterData.GetProjection()
+	unitArea = abs(geotr[1]) * abs(geotr[5])
+	band = rasterData.GetRasterBand(bandNumber)
+	noDataValue = band.GetNoDataValue()
+	
+	if projection and zones.crs and not zones.crs.equals(pyproj.CRS(projection)):
+		zones = zones.to_crs(projection)
+	ids = zones[zoneField].values if zoneField else zones.index.values
+	numberOfZones = len(zones)
+	
+	#rasterize zones once, burn values are positions of zones + 1, 0 for none
+	zoneRaster = '/vsimem/zones%s.tif' % str(int(time.time()*1e6))
+	zoneData = gdal.GetDriverByName('GTiff').Create(zoneRaster, rasterData.RasterXSize, rasterData.RasterYSize, 1, gdal.GDT_Int32,
+		options=['TILED=YES', 'COMPRESS=LZW'])
+	zoneData.SetGeoTransform(geotr)
+	zoneData.SetProjection(projection)
+	datasource, layer = memoryLayer(zones.geometry.values.to_numpy(), projection, values=np.arange(1, numberOfZones + 1))
+	gdal.RasterizeLayer(zoneData, [1], layer, options=['ATTRIBUTE=value'])
+	
+	counter = Counter()
+	counts = np.zeros(numberOfZones + 1, dtype='int64')
+	sums = np.zeros(numberOfZones + 1)
+	minimums = np.full(numberOfZones + 1, np.inf)
+	maximums = np.full(numberOfZones + 1, -np.inf)
+	try:
+		for zone, value in readBlocks([zoneData.GetRasterBand(1), band], blockRows):
+			valid = zone > 0
+			if noDataValue is not None: valid &= value != noDataValue
+			if np.issubdtype(value.dtype, np.floating): valid &= ~np.isnan(value)
+			zone, value = zone[valid], value[valid]
+			if len(zone) == 0: continue
+			if categorical:
+				classes, inverse = np.unique(value, return_inverse=True)
+				#counts of zone-class pairs in the block, bounded by pixels of the block rather than zones x classes
+				pairs, pairCounts = np.unique(zone.astype('int64') * len(classes) + inverse.ravel(), return_counts=True)
+				counter.update(dict(zip(zip((pairs // len(classes)).tolist(), classes[pairs % len(classes)].tolist()), pairCounts.tolist())))
+			else:
+				counts += np.bincount(zone, minlength=numberOfZones + 1)
+				sums += np.bincount(zone, weights=value, minlength=numberOfZones + 1)
+				np.minimum.at(minimums, zone, value)
+				np.maximum.at(maximums, zone, value)
+	finally:
+		zoneData = None
+		gdal.Unlink(zoneRaster)
+	
+	if categorical:
+		totals = Counter()
+		for (position, classType), count in counter.items(): totals[position] += count
+		return [{'zone': ids[position - 1], 'class': classType, 'area': count * unitArea, 'proportion': count / totals[position]}
+			for (position, classType), count in sorted(counter.items())]
+	return [{'zone': ids[position - 1], 'count': int(counts[position]), 'sum': sums[position],
+			'mean': sums[position] / counts[position], 'min': minimums[position], 'max': maximums[position]}
+		for position in np.flatnonzero(counts) if position > 0]
+
+def voronoiCellsTile(geometries, ids, core, envelope, spacing=None):
+	'''Voronoi cells of polygons in a tile, a worker for `voronoiDiagram4plgPartitioned`.
+	
+	Parameters:
+		geometries: polygons intersected with `envelope`
+			Type: numpy.ndarray of shapely geometries
+		ids: ids of `geometries`
+			Type: numpy.ndarray
+		core: the tile, cells are clipped by it
+			Type: shapely.geometry.Polygon
+		envelope: the tile with halo
+			Type: shapely.geometry.Polygon
+		spacing: if assigned, densify boundaries of polygons by it
+			Type: float
+			Default: None
+	Returns:
+		ids and cells
+			Type: numpy.ndarray
+	'''
+	if spacing: geometries = shapely.segmentize(geometries, spacing)
+	#vertices of the union, ie, without vertices inside other polygons but with intersections of boundaries, same as `voronoiDiagram4plg`
+	points = np.unique(shapely.get_coordinates(shapely.union_all(geometries)), axis=0)
+	cells = shapely.get_parts(shapely_ops.voronoi_diagram(shapely.multipoints(points), envelope=envelope))
+	invalid = ~shapely.is_valid(cells)
+	cells[invalid] = shapely.buffer(cells[invalid], 0)	# fix invalid cells, same as `voronoiDiagram4plg`
+	#assign cells to the polygons they intersect, same as `voronoiDiagram4plg`
+	indexCell, indexGeometry = shapely.STRtree(geometries).query(cells, predicate='intersects')
+	cells = shapely.intersection(cells[indexCell], core)
+	valid = ~shapely.is_empty(cells)
+	return ids[indexGeometry[valid]], cells[valid]
+
+def voronoiDiagram4plgPartitioned(gdf, mask, partitions=4, halo=None, spacing=None, processes=None):
+	'''Create Voronoi diagram / Thiessen polygons based on polygons, a partitioned and parallel version of `voronoiDiagram4plg`.
+	
+	The extent of `mask` is split into tiles. Each tile is enlarged by `halo`, its diagram is created from the polygons intersected with the enlarged tile in a process pool and clipped by the tile. Cells are then merged by polygon and clipped by `mask`. The halo should be wide enough to cover the polygons which affect cells inside the tile, eg, a few times of typical gaps between polygons.
+	
+	Parameters:
+		gdf: polygons
+			Type: geopandas.GeoDataFrame
+		mask: used to clip the diagram
+			Type: geopandas.GeoDataFrame, geopandas.GeoSeries, shapely geometry
+		partitions: tiles along x and y
+			Type: integer, list of two integers
+			Default: 4
+		halo: width to enlarge tiles, half of the tile size if None
+			Type: float
+			Default: None
+		spacing: see function `voronoiCellsTile`
+			Type: float
+			Default: None
+		processes: number of worker processes, `os.cpu_count()` if None
+			Type: integer
+			Default: None
+	Returns:
+		gdf_vd: Thiessen polygons
+			Type: geopandas.GeoDataFrame
+	'''
+	from multiprocessing import Pool
+	from longsgis.longsgis import dropHoles
+	
+	xparts, yparts = (partitions, partitions) if isinstance(partitions, int) else partitions
+	gdf = gdf.reset_index(drop=True)
+	geometries = gdf.geometry.values.to_numpy()
+	ids = np.arange(len(gdf))
+	tree = shapely.STRtree(geometries)
+	
+	maskGeometry = mask
+	if isinstance(mask, (gpd.GeoDataFrame, gpd.GeoSeries)):
+		maskGeometry = mask.union_all() if hasattr(mask, 'union_all') else mask.unary_union
+	xmin, ymin, xmax, ymax = maskGeometry.bounds
+	dx, dy = (xmax - xmin) / xparts, (ymax - ymin) / yparts
+	halo = halo if halo else 0.5 * max(dx, dy)
+	
+	jobs = []
+	for i in range(xparts):
+		for j in range(yparts):
+			x0, y0 = xmin + i * dx, ymin + j * dy
+			core = shapely.box(x0, y0, x0 + dx, y0 + dy)
+			envelope = shapely.box(x0 - halo, y0 - halo, x0 + dx + halo, y0 + dy + halo)
+			index = tree.query(envelope, predicate='intersects')
+			if len(index): jobs.append((geometries[index], ids[index], core, envelope, spacing))
+	if not jobs: return gdf.iloc[:0].copy()	#no polygon around `mask`
+	with Pool(processes) as pool:
+		results = pool.starmap(voronoiCellsTile, jobs)
+	
+	#merge cells by polygon
+	cells = gpd.GeoDataFrame({'index_right': np.concatenate([result[0] for result in results])},
+		geometry=np.concatenate([result[1] for result in results]), crs=gdf.crs)
+	cells = cells.dissolve(by='index_right')
+	gdf_temp = gdf.loc[cells.index].copy()
+	gdf_temp[gdf.geometry.name] = cells.geometry.values
+	gdf_vd = gpd.clip(gdf_temp.reset_index(drop=True), mask)
+	gdf_vd[gdf.geometry.name] = gdf_vd.geometry.map(dropHoles)
+	return gdf_vd
@@ -152,15 +152,13 @@ def featCollTransitionMatrix(eeImage0, eeImage1, eeFeatColl, scale=30, additiona
 	Returns:
 		List of dictionaries
 	'''
-	len = eeFeatColl.size().getInfo()
 	transitions = []
-	for i in range(len):
-		feature = getFeatureByIndex(eeFeatColl, i)
+	for feature, featureDict in iterFeatures(eeFeatColl):
 		geometry = feature.geometry()
 		#non-general practice
 		if not upperLevelSubregion:
 			#ydm urban case
-			additional.update({'builtupArea':feature.get('area').getInfo()}) #non-general practice
+			additional.update({'builtupArea':featureDict['properties'].get('area')}) #non-general practice
 		else:
 			#ydm nonurban case
 			mark_sr = ee.Feature(upperLevelSubregion.filterBounds(geometry.buffer(-5000)).first()).get('code').getInfo()
@@ -11,14 +11,51 @@
 * Use <function name> to invoke the specific function directly
 """
 
-import csv, math, os, platform
+import csv, importlib, json, math, os, platform, sys, types
 import pathlib, shutil, traceback, zipfile
 from datetime import datetime, date, timedelta
 from multiprocessing.dummy import Pool as ThreadPool
 from itertools import repeat
 
-import matplotlib as mpl
-import pandas as pd
+class lazyModule(types.ModuleType):
+	'''A module proxy which imports the real module at the first attribute access, see function `lazyImport`.
+	
+	Attributes are cached in the proxy after the first access. Submodules not imported by the package itself, eg, `matplotlib.dates`, are imported on access too.
+	'''
+	
+	def __getattr__(self, attr):
+		if attr.startswith('__'): raise AttributeError(attr)
+		module = self.__dict__.get('_lazyModule__module')
+		if module is None:
+			module = importlib.import_module(self.__name__)
+			self.__dict__['_lazyModule__module'] = module
+		try:
+			value = getattr(module, attr)
+		except AttributeError:
+			try:
+				value = importlib.import_module('%s.%s' % (self.__name__, attr))
+			except ModuleNotFoundError:
+				raise AttributeError("module '%s' has no attribute '%s'" % (self.__name__, attr)) from None
+		setattr(self, attr, value)
+		return value
+	
+	def __dir__(self):
+		return dir(importlib.import_module(self.__name__))
+
+def lazyImport(name):
+	'''Import a module lazily, ie, defer the real import till an attribute is accessed, eg, `pd = lazyImport('pandas')`.
+	
+	Parameters:
+		name: full name of module
+			Type: string
+	Returns:
+		the module if imported already, or a `lazyModule`
+	'''
+	return sys.modules[name] if name in sys.modules else lazyModule(name)
+
+mpl = lazyImport('matplotlib')
+mpl_dates = lazyImport('matplotlib.dates')	#submodules apart, `matplotlib` may be imported already without them
+pd = lazyImport('pandas')
 
 def fileIsValid(filename):
 	'''Check if a file exist and non-empty
@@ -141,6 +178,147 @@ def writeLogsDicts2csv(fileName, dicts):
 	except:
 		return False
 
+def writeLogsDicts2csvStreamed(fileName, dicts):
+	'''	Write an iterable of dictionaries to a csv-format file row by row, in constant memory. The same as `writeLogsDicts2csv` otherwise, ie, headers are keys of the first dictionary, and rows are appended to a valid existing file.
+	
+	Parameters:
+		fileName: output filename
+			Type: string, pathlib.PosixPath
+		dicts: output dictionaries
+			Type: iterable, eg, generator, of dictionaries
+	Returns:
+		Boolean, or None if `dicts` is empty
+	'''
+	try:
+		dicts = iter(dicts)
+		first = next(dicts, None)
+		if first is None: return None
+		exists = fileIsValid(fileName)
+		with open(fileName, 'a' if exists else 'w', newline='') as f:
+			writer = csv.DictWriter(f, fieldnames=first.keys())
+			if not exists: writer.writeheader()
+			writer.writerow(first)
+			writer.writerows(dicts)
+		return True
+	except:
+		return False
+
+def adjustFeatureDict4csv(featureDict, geometry = '.geo', properties = None):
+	'''Customize original nested dictionary to a dictionary which can be save to geocsv directly.
+	
+	Parameters:
+		featureDict: the original nested dictionary
+			Type: dictionary (nested)
+		geometry: optinal, field for geometry, it is a must for geocsv file. Although it can be ignored be set to other assignment.
+			Type: string
+			Default: '.geo', is equivalent to 'None'
+		properties: optional, need all then assign 'all'
+			Type: string, list
+			Default: None
+	Returns:
+		Dictionary
+	'''
+	newdict = {}
+	if properties:
+		if isinstance(properties, str):
+			if 'ALL' in properties.upper():
+				newdict.update(featureDict['properties'])
+			else:
+				try:
+					newdict[properties] = featureDict['properties'][properties]
+				except:
+					print('Warning -- check keyword "%s"' % properties)
+		elif isinstance(properties, list):
+			for property in properties:
+				try:
+					newdict[property] = featureDict['properties'][property]
+				except:
+					print('-'*60); traceback.print_exc(); print('-'*60)
+					print('Warning -- check keyword "%s" in list "properties"' % property)
+	
+	if not geometry or geometry == '.geo':
+		if featureDict['geometry'] ==  None:	#'null' will be 'None' in python
+			newdict[geometry] = ''
+		else:
+			newdict[geometry] = json.dumps(featureDict['geometry'])
+	else:
+		print('Warning -- check keyword "%s"' % geometry)
+	
+	return newdict
+
+try:
+	import ijson
+except ImportError:
+	ijson = None
+
+def iterGeoJsonFeatures(opener, name=''):
+	'''Parse features from a geojson file incrementally by `ijson` (if installed), ie, in constant memory whatever the file size.
+	
+	Parameters:
+		opener: a function returning a context manager of a binary file object, eg, `lambda: open(fileName, 'rb')`; it is invoked again for a file without features, eg, a single Feature
+			Type: function
+		name: filename in messages
+			Type: string
+			Default: ''
+	Yields:
+		feature dictionary
+	Raises:
+		ValueError: if 'type' is neither 'FeatureCollection' nor 'Feature'
+	'''
+	count = 0
+	if ijson:
+		with opener() as f:
+			for feature in ijson.items(f, 'features.item', use_float=True):
+				count += 1
+				yield feature
+		if count: return
+	with opener() as f:
+		geodict = json.load(f)	#no features, ie, a single Feature or an empty FeatureCollection, or without `ijson`
+	if geodict['type'] == 'FeatureCollection':
+		yield from geodict['features']
+	elif geodict['type'] == 'Feature':
+		yield geodict
+	else:
+		raise ValueError('check "type" in %s' % name)
+
+def iterFeatureDictsFromGeoJson(fileNameGeoJson, geometry = '.geo', properties = None):
+	'''An iterator version of `parseFeatureDictsFromGeoJson`, features are parsed incrementally by `iterGeoJsonFeatures` and adjusted one by one.
+	
+	Parameters:
+		fileNameGeoJson: input filename
+			Type: string, pathlib.PosixPath
+		geometry: see function 'adjustFeatureDict4csv'
+		properties: see function 'adjustFeatureDict4csv'
+	Yields:
+		dictionary for geocsv
+	'''
+	for feature in iterGeoJsonFeatures(lambda: open(fileNameGeoJson, 'rb'), fileNameGeoJson):
+		yield adjustFeatureDict4csv(feature, geometry, properties)
+
+def geojson2csvShard(fileNameGeoJson, fileNameShard, geometry = '.geo', properties = None, sortField=None, sortReverse=False):
+	'''A worker of `geojson2csvParallel`, converting a geojson file to a headless csv shard, sorted and with a leading column of json-encoded sort keys if `sortField` is assigned.
+	
+	Returns:
+		header (list of fields), None if no feature, or False if failed (eg, failed sorting)
+	'''
+	try:
+		features = list(iterFeatureDictsFromGeoJson(fileNameGeoJson, geometry, properties))
+	except ValueError:
+		print('Failed -- Parsing -- check "type" in %s' % fileNameGeoJson)
+		return None
+	if not features: return None
+	try:
+		if sortField:
+			features.sort(key = lambda d: d[sortField], reverse = sortReverse)	#stable, same as `sortDictList`
+		header = list(features[0].keys())
+		with open(fileNameShard, 'w', newline='') as f:
+			writer = csv.DictWriter(f, fieldnames=(['.sortKey'] if sortField else []) + header)
+			for d in features:
+				writer.writerow(dict(d, **{'.sortKey': json.dumps(d[sortField])}) if sortField else d)
+		return header
+	except Exception:
+		return False
+
 #overwrite a record/log or list into a file
 def overwriteLogs(fileName, text):
 	if isinstance(text, (str, float, int)):	#single record
@@ -297,7 +475,7 @@ def dt64ToDatetime(datetime64):
 #convert pandas datetime(datetime64) to mplDates
 def pdDatetime2mplDates(pdDatetime):
 	dt = dt64ToDatetime(pdDatetime)
-	mplDates = mpl.dates.date2num(dt)
+	mplDates = mpl_dates.date2num(dt)
 	return mplDates
 
 #read file without comment lines (#)
@@ -534,3 +712,26 @@ def is_number(string):
 		return True
 	except ValueError:
 		return False
+
+def gridCells(xmin, ymin, xmax, ymax, dx, dy, exclude=None):
+	'''Compute all cell rectangles of a regular grid at once, in the same order as nested loops of x (outer) and y (inner).
+	
+	Parameters:
+		xmin, ymin, xmax, ymax: extent, lower-left corners of cells are `numpy.arange(xmin, xmax, dx)` by `numpy.arange(ymin, ymax, dy)`
+			Type: float
+		dx, dy: cell size
+			Type: float
+		exclude: cells with lower-left corner in [xmin, xmax) x [ymin, ymax) of it are dropped, eg, for the extension part only
+			Type: tuple of (xmin, ymin, xmax, ymax)
+			Default: None
+	Returns:
+		numpy.ndarray of shape (cells, 4), rows of [x1, y1, x2, y2]
+	'''
+	import numpy as np
+	xmin, ymin, xmax, ymax, dx, dy = float(xmin), float(ymin), float(xmax), float(ymax), float(dx), float(dy)
+	x, y = np.meshgrid(np.arange(xmin, xmax, dx), np.arange(ymin, ymax, dy), indexing='ij')
+	x, y = x.ravel(), y.ravel()
+	if exclude:
+		inside = (exclude[0] <= x) & (x < exclude[2]) & (exclude[1] <= y) & (y < exclude[3])
+		x, y = x[~inside], y[~inside]
+	return np.column_stack((x, y, x + dx, y + dy))
@@ -0,0 +1,18 @@
+# -*- coding: utf-8 -*-
+"""
+* Updated on 2026/10/19
+* python3
+**
+* test of segmentedVolume in chunked mode, the results should match the in-memory mode
+"""
+import math, pathlib
+from lots.gis import segmentedVolume
+
+file_dem = pathlib.Path('gis/dem.gpkg')
+start, stop, step = 0.5, 2, 0.05
+data = segmentedVolume(file_dem, start, stop, step)
+data_chunked = segmentedVolume(file_dem, start, stop, step, chunks=1024)	# dask threaded scheduler by default
+for line, line_chunked in zip(data, data_chunked):
+	assert line['area'] == line_chunked['area']
+	assert math.isclose(line['volume'], line_chunked['volume'], rel_tol=1e-6)
+print('Done.')
@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+"""
+* Updated on 2026/10/19
+* python3
+**
+* benchmark of import time of lots.gis, with heavy dependencies imported eagerly (before) and lazily (after)
+* dependencies not installed are left out of the eager imports, statements which fail are reported as skipped, only the eager one may fail
+"""
+import importlib.util, statistics, subprocess, sys
+
+def installed(module):
+	try:
+		return importlib.util.find_spec(module) is not None
+	except ModuleNotFoundError:	# parent package is missing
+		return False
+
+dependencies = {
+	'geopandas': 'import geopandas', 'shapely': 'import shapely, shapely.ops', 'pyproj': 'import pyproj',
+	'rioxarray': 'import rioxarray', 'matplotlib': 'import matplotlib', 'pandas': 'import pandas',
+	'longsgis.longsgis': 'import longsgis.longsgis', 'osgeo': 'from osgeo import gdal, gdal_array, ogr, osr',
+	}
+missing = [module for module in dependencies if not installed(module)]
+eager = ''.join('%s; ' % statement for module, statement in dependencies.items() if module not in missing)
+statements = {
+	'before, eager imports': eager + 'import lots.gis',
+	'after, import lots.gis': 'import lots.gis',
+	'after, import + transformPoint': 'import lots.gis; lots.gis.transformPoint("EPSG:4326", "EPSG:3857", [120, 30])',
+	'after, shapely imported first': 'import shapely, lots.gis; lots.gis.transformPoint("EPSG:4326", "EPSG:3857", [120, 30])',
+	}
+timer = 'import time; t = time.perf_counter(); %s; print(time.perf_counter() - t)'
+
+if missing: print('Warning -- not installed, left out of eager imports: %s' % ', '.join(missing))
+repeats = 5
+skipped = []
+for name, statement in statements.items():
+	seconds = []
+	for _ in range(repeats):
+		process = subprocess.run([sys.executable, '-c', timer % statement], capture_output=True, text=True)
+		if process.returncode != 0: break
+		seconds.append(float(process.stdout))
+	if len(seconds) < repeats:
+		print('%-32s skipped, %s' % (name, (process.stderr.strip().splitlines() or ['failed'])[-1]))
+		skipped.append(name)
+		continue
+	print('%-32s median %.3f s, min %.3f s' % (name, statistics.median(seconds), min(seconds)))
+assert all(name.startswith('before') for name in skipped), skipped	# lazy imports should work whatever is imported already
+print('Done.')
@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+"""
+* Updated on 2026/10/19
+* python3
+**
+* test of generateGrid and extendGrid against a stand-in `ee` module, grids should be flat and match the nested loops
+"""
+import pathlib, sys, time
+sys.path.insert(0, str(pathlib.Path(__file__).parent))
+import fake_ee; fake_ee.install()
+import numpy as np
+from lots.gee import generateGrid, extendGrid
+
+def cells(eeFeatColl):
+	return [feature['geometry']['coordinates'][0][0] + feature['geometry']['coordinates'][0][2]
+		for feature in eeFeatColl.getInfo()['features']]
+
+xmin, ymin, xmax, ymax, dx, dy = 100, 20, 110, 26, 0.5, 0.25
+loops = [[x, y, x + dx, y + dy] for x in np.arange(xmin, xmax, dx) for y in np.arange(ymin, ymax, dy)]
+grid = generateGrid(xmin, ymin, xmax, ymax, dx, dy)
+assert np.allclose(cells(grid), loops) and grid.depth <= 3
+assert np.allclose(cells(generateGrid(xmin, ymin, xmax, ymax, dx, dy, serverSide=True)), loops)
+
+ring = extendGrid(xmin, ymin, xmax, ymax, dx, dy, multiple=2)
+assert len(cells(ring)) == (len(np.arange(xmin - 2*dx, xmax + 2*dx, dx)) * len(np.arange(ymin - 2*dy, ymax + 2*dy, dy)) - len(loops))
+assert len(cells(extendGrid(xmin, ymin, xmax, ymax, dx, dy, output='all'))) == 22 * 26
+
+start = time.time()
+planet = generateGrid(-180, -90, 180, 90, 0.5, 0.5)	# gridThePlanet(0.5, 0.5), server-side
+print('%d cells, graph depth %d, %.2f s' % (planet.size().getInfo(), planet.depth, time.time() - start))
+print('Done.')
@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+"""
+* Updated on 2026/10/19
+* python3
+**
+* test of featureCollectionIntersection against a stand-in `ee` module, the expression size and the requests should not grow with the input size
+"""
+import pathlib, sys
+sys.path.insert(0, str(pathlib.Path(__file__).parent))
+import fake_ee; fake_ee.install()
+from lots.gee import featureCollectionIntersection, featureCollectionIntersectionLegacy, generateGrid
+
+def areas(eeFeatColl):
+	return sorted(round(fake_ee.shape(feature['geometry']).area, 9) for feature in eeFeatColl.getInfo()['features'])
+
+def polygons(n):
+	return fake_ee.FeatureCollection([fake_ee.Feature(fake_ee.Geometry.Rectangle([i * 0.7, 0.1, i * 0.7 + 1, 1.3]), {'id': i}) for i in range(n)])
+
+for n in (4, 16, 64):
+	featColl01, featColl02 = polygons(n), generateGrid(0, 0, n, 2, 1, 1)
+	fake_ee.reset()
+	result = featureCollectionIntersection(featColl01, featColl02)
+	nodes, requests = fake_ee.stats['nodes'], fake_ee.stats['requests']
+	fake_ee.reset()
+	legacy = featureCollectionIntersectionLegacy(featColl01, featColl02)
+	print('%3d features: %4d nodes, %d requests; legacy %5d nodes, %d requests' % (n, nodes, requests, fake_ee.stats['nodes'], fake_ee.stats['requests']))
+	assert areas(result) == areas(legacy)
+	assert requests == 0 and nodes < 20
+print('Done.')
@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+"""
+* Updated on 2026/10/19
+* python3
+**
+* test of iterFeatureDicts against a stand-in `ee` module, by page tokens and by `toList` pages, with prefetching
+"""
+import pathlib, sys
+sys.path.insert(0, str(pathlib.Path(__file__).parent))
+import fake_ee; ee = fake_ee.install()
+from lots.gee import iterFeatureDicts, iterFeatures
+
+eeFeatColl = ee.FeatureCollection([ee.Feature(ee.Geometry.Rectangle([i, 0, i + 1, 1]), {'id': i}) for i in range(2500)])
+for pageSize in (1000, 2500, 7):
+	for prefetch in (True, False):
+		fake_ee.reset()
+		ids = [featureDict['properties']['id'] for featureDict in iterFeatureDicts(eeFeatColl, pageSize, prefetch)]
+		assert ids == list(range(2500)) and fake_ee.stats['requests'] == -(-2500 // pageSize)
+
+computeFeatures = ee.data.computeFeatures
+del ee.data.computeFeatures		# fall back to `toList` pages
+fake_ee.reset()
+ids = [feature.get('id') for feature, _ in iterFeatures(eeFeatColl, 1000)]
+assert ids == list(range(2500)) and fake_ee.stats['requests'] == 3
+ee.data.computeFeatures = computeFeatures
+
+# stop early, the prefetching thread should quit
+iterator = iterFeatureDicts(eeFeatColl, 10)
+next(iterator); iterator.close()
+print('Done.')
@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+"""
+* Updated on 2026/10/19
+* python3
+**
+* test of downloaderPool against a stand-in `ee` module, with slow and flaky tables
+"""
+import pathlib, sys, tempfile, threading, time, zipfile
+sys.path.insert(0, str(pathlib.Path(__file__).parent))
+import fake_ee; ee = fake_ee.install()
+from lots.gee import downloaderPool
+
+inFlight = {'now': 0, 'max': 0}
+lock = threading.Lock()
+
+class SlowCollection(ee.FeatureCollection):
+	'''A table taking 0.1 s to fetch, failing the first `failures` fetches.'''
+	def __init__(self, features, failures=0):
+		super().__init__(features)
+		self.failures = failures
+	def getInfo(self):
+		with lock:
+			inFlight['now'] += 1; inFlight['max'] = max(inFlight['max'], inFlight['now'])
+		time.sleep(0.1)
+		with lock:
+			inFlight['now'] -= 1
+		if self.failures:
+			self.failures -= 1
+			raise RuntimeError('Too many concurrent aggregations')
+		return super().getInfo()
+
+features = [ee.Feature(ee.Geometry.Rectangle([i, 0, i + 1, 1]), {'id': i}) for i in range(10)]
+with tempfile.TemporaryDirectory() as folder:
+	folder = pathlib.Path(folder)
+	jobs = [(SlowCollection(features, failures=1 if i % 5 == 0 else 0), folder / ('tile%07d.geojson' % i)) for i in range(20)]
+	start = time.time()
+	results = downloaderPool(jobs, zipFile=folder / 'tiles.zip', threads=4, backoff=0.05, progress=False)
+	print('%.2f s, at most %d in flight' % (time.time() - start, inFlight['max']))
+	assert all(result['success'] for result in results) and inFlight['max'] == 4
+	assert [result['attempts'] for result in results].count(2) == 4
+	with zipfile.ZipFile(folder / 'tiles.zip') as f:
+		assert len(f.namelist()) == 20
+	assert not list(folder.glob('*.geojson'))
+	
+	results = downloaderPool([(SlowCollection(features, failures=5), folder / 'bad.geojson')], attempts=2, backoff=0.01, progress=False)
+	assert not results[0]['success'] and not (folder / 'bad.geojson').exists()
+print('Done.')
@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+"""
+* Updated on 2026/10/19
+* python3
+**
+* test of downloadTable against a stand-in `ee` module, geojson and csv in one pass, csv framing same as the legacy writer
+"""
+import csv, json, pathlib, sys, tempfile
+sys.path.insert(0, str(pathlib.Path(__file__).parent))
+import fake_ee; ee = fake_ee.install()
+from lots.gee import downloadTable, downloadTableToCsv, tableWriter
+
+eeFeatColl = ee.FeatureCollection([ee.Feature(ee.Geometry.Rectangle([i * 0.1, 0, i * 0.1 + 1, 1]), {'id': i}) for i in range(1000)])
+geometries = [feature['geometry'] for feature in eeFeatColl.getInfo()['features']]
+with tempfile.TemporaryDirectory() as folder:
+	fileNameGeoJson, fileNameCSV = pathlib.Path(folder) / 'table.geojson', pathlib.Path(folder) / 'table.csv'
+	downloadTable(eeFeatColl, fileNameGeoJson, fileNameCSV)
+	assert json.loads(fileNameGeoJson.read_text()) == eeFeatColl.getInfo()
+	lines = fileNameCSV.read_text().split('\n')
+	assert lines[0] == '.geo' and len(lines) == 1001 and not lines[-1].endswith('\n')
+	assert [json.loads(line[1:-1]) for line in lines[1:]] == geometries
+	
+	downloadTableToCsv(eeFeatColl, fileNameCSV)
+	assert fileNameCSV.read_text().split('\n') == lines
+	downloadTable(eeFeatColl, fileNameGeoJson, fileNameCSV, filetype='geojson')
+	assert json.loads(fileNameGeoJson.read_text()) == eeFeatColl.getInfo()
+	
+	try:	#an error in flight, the GeoJSON should not be closed as a valid one
+		with tableWriter(fileNameGeoJson) as writer:
+			writer.write(eeFeatColl.getInfo()['features'][0])
+			raise RuntimeError('fetch failed')
+	except RuntimeError:
+		pass
+	try:
+		json.loads(fileNameGeoJson.read_text())
+		raise AssertionError('a valid GeoJSON left')
+	except json.JSONDecodeError:
+		pass
+print('Done.')
@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+"""
+* Updated on 2026/10/19
+* python3
+**
+* test of downloadTableByUrl against a stand-in `ee` module and a local HTTP server
+"""
+import http.server, json, pathlib, sys, tempfile, threading
+sys.path.insert(0, str(pathlib.Path(__file__).parent))
+import fake_ee; ee = fake_ee.install()
+from lots.gee import downloadTableByUrl, downloader
+
+body = json.dumps({'type': 'FeatureCollection', 'features': [
+	{'type': 'Feature', 'geometry': {'type': 'Point', 'coordinates': [i, i]}, 'properties': {'id': i}} for i in range(20000)]}).encode()
+requests = []
+
+class Handler(http.server.BaseHTTPRequestHandler):
+	def do_GET(self):
+		requests.append(self.path)
+		if self.path.startswith('/error'):
+			content = b'Internal Earth Engine error.\n' + b' ' * 100
+		else:
+			content = body
+		self.send_response(200)
+		self.send_header('Content-Length', str(len(content)))
+		self.end_headers()
+		self.wfile.write(content)
+	def log_message(self, *args):
+		pass
+
+server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+threading.Thread(target=server.serve_forever, daemon=True).start()
+
+fake_ee.downloadUrlBase = 'http://127.0.0.1:%d' % server.server_address[1]
+with tempfile.TemporaryDirectory() as folder:
+	filename = pathlib.Path(folder) / 'table.geojson'
+	assert downloadTableByUrl('users/test/table', filename, chunkSize=4096)
+	assert filename.read_bytes() == body and requests[-1].endswith('filetype=geojson')
+	assert not list(pathlib.Path(folder).glob('*.part'))
+	
+	filename.unlink()
+	assert not downloadTableByUrl('error', filename)
+	assert not filename.exists() and not list(pathlib.Path(folder).glob('*.part'))
+	
+	downloader('users/test/table', filename, streamed=True)
+	assert filename.read_bytes() == body
+server.shutdown()
+print('Done.')
@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+"""
+* Updated on 2026/10/19
+* python3
+**
+* test of downloadTableSharded against a stand-in `ee` module, all features should be written once, without the random column
+"""
+import json, pathlib, sys, tempfile
+sys.path.insert(0, str(pathlib.Path(__file__).parent))
+import fake_ee; ee = fake_ee.install()
+from lots.gee import downloadTableSharded
+
+eeFeatColl = ee.FeatureCollection([ee.Feature(ee.Geometry.Rectangle([i, 0, i + 1, 1]), {'id': i}) for i in range(23000)])
+with tempfile.TemporaryDirectory() as folder:
+	fileNameGeoJson, fileNameCSV = pathlib.Path(folder) / 'table.geojson', pathlib.Path(folder) / 'table.csv'
+	fake_ee.reset()
+	count = downloadTableSharded(eeFeatColl, fileNameGeoJson, fileNameCSV, shardSize=4000, threads=4)
+	assert count == 23000 and fake_ee.stats['requests'] == 1 + 6	# size + shards
+	features = json.loads(fileNameGeoJson.read_text())['features']
+	assert sorted(feature['properties']['id'] for feature in features) == list(range(23000))
+	assert all(list(feature['properties']) == ['id'] for feature in features)
+	assert len(fileNameCSV.read_text().split('\n')) == 23001
+	
+	assert downloadTableSharded(ee.FeatureCollection(eeFeatColl.features[:10]), fileNameGeoJson) == 10
+	
+	#a shard failed after its retries, no partial file should be left
+	getInfo = ee.FeatureCollection.getInfo
+	def failing(self):
+		if any(feature.properties['id'] == 5000 for feature in self.features): raise RuntimeError('shard failed')
+		return getInfo(self)
+	ee.FeatureCollection.getInfo = failing
+	fileNameGeoJson.unlink(); fileNameCSV.unlink()
+	try:
+		downloadTableSharded(eeFeatColl, fileNameGeoJson, fileNameCSV, shardSize=4000, threads=4, attempts=1)
+		raise AssertionError('no error raised')
+	except RuntimeError:
+		pass
+	finally:
+		ee.FeatureCollection.getInfo = getInfo
+	assert list(pathlib.Path(folder).iterdir()) == []
+print('Done.')
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+"""
+* Updated on 2026/10/19
+* python3
+**
+* test of geojson2csv and geojsonInZip2csv, the streamed and parallel outputs should match the legacy in-memory parsing
+"""
+import csv, json, pathlib, random, sys, tempfile, zipfile
+sys.path.insert(0, str(pathlib.Path(__file__).parent))
+import fake_ee; fake_ee.install()
+from lots.gee import adjustFeatureDict4csv, geojson2csv, geojsonInZip2csv
+
+def legacy(files, properties, sortField=None):
+	features = []
+	for file in files:
+		geodict = json.loads(pathlib.Path(file).read_text())
+		geodicts = geodict['features'] if geodict['type'] == 'FeatureCollection' else [geodict]
+		features.extend(adjustFeatureDict4csv(feature, '.geo', properties) for feature in geodicts)
+	if sortField: features.sort(key=lambda d: d[sortField])
+	return [{key: str(value) for key, value in feature.items()} for feature in features]
+
+def rows(fileNameCSV):
+	with open(fileNameCSV, newline='') as f:
+		return list(csv.DictReader(f))
+
+if __name__ == '__main__':
+	generator = random.Random(0)
+	with tempfile.TemporaryDirectory() as folder:
+		folder = pathlib.Path(folder)
+		files = []
+		for i in range(3):
+			features = [{'type': 'Feature', 'geometry': {'type': 'Point', 'coordinates': [generator.uniform(-180, 180), generator.uniform(-90, 90)]},
+				'properties': {'id': i * 100 + j, 'area': generator.random() * 1e6, 'name': 'tile %d' % j}} for j in range(100)]
+			files.append(folder / ('part%d.geojson' % i))
+			files[-1].write_text(json.dumps({'type': 'FeatureCollection', 'features': features}))
+		files.append(folder / 'single.geojson')
+		files[-1].write_text(json.dumps(features[0]))
+		
+		geojson2csv(files, folder / 'all.csv', properties='all')
+		assert rows(folder / 'all.csv') == legacy(files, 'all')
+		geojson2csv(files, folder / 'sorted.csv', properties=['id', 'area'], sortField='area')
+		assert rows(folder / 'sorted.csv') == legacy(files, ['id', 'area'], 'area')
+		
+		for sortField, sortReverse, addSortOrder in ((None, False, False), ('area', False, True), ('name', True, 'rank'), ('id', True, False)):
+			serial, parallel = folder / ('serial%s.csv' % sortField), folder / ('parallel%s.csv' % sortField)
+			geojson2csv(files, serial, properties='all', sortField=sortField, sortReverse=sortReverse, addSortOrder=addSortOrder)
+			geojson2csv(files, parallel, properties='all', sortField=sortField, sortReverse=sortReverse, addSortOrder=addSortOrder, processes=2)
+			assert serial.read_bytes() == parallel.read_bytes(), sortField
+		
+		with zipfile.ZipFile(folder / 'parts.zip', 'w') as f:
+			f.write(files[0], 'part0.geojson')
+		geojsonInZip2csv(folder / 'parts.zip', 'part0.geojson', folder / 'zip.csv', properties='all')
+		assert rows(folder / 'zip.csv') == legacy(files[:1], 'all')
+	print('Done.')
@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+"""
+* Updated on 2026/10/19
+* python3
+**
+* test of bufferDissolve in partitioned mode, the results should match the serial mode, including buffers touching on a tile edge
+"""
+import numpy as np
+import geopandas as gpd
+import shapely
+from lots.gis import bufferDissolve
+
+def assertSame(gdf, distance, join_style, partitions):
+	serial = bufferDissolve(gdf, distance, join_style=join_style)
+	partitioned = bufferDissolve(gdf, distance, join_style=join_style, partitions=partitions, processes=2)
+	assert len(serial) == len(partitioned), (len(serial), len(partitioned))
+	assert np.isclose(serial.area.sum(), partitioned.area.sum())
+	assert shapely.symmetric_difference(shapely.union_all(serial.geometry.values), shapely.union_all(partitioned.geometry.values)).area < 1e-6 * serial.area.sum()
+
+if __name__ == '__main__':
+	rng = np.random.default_rng(0)
+	points = gpd.GeoDataFrame(geometry=gpd.points_from_xy(*rng.uniform(0, 1000, (2, 2000))))
+	for join_style in (1, 2, 3):
+		assertSame(points, 8, join_style, 4)
+	polygons = gpd.GeoDataFrame(geometry=[shapely.box(x, y, x + w, y + h) for x, y, w, h in rng.uniform([0, 0, 1, 1], [1000, 1000, 20, 20], (500, 4))])
+	assertSame(polygons, 5, 2, [3, 2])
+	
+	# buffers touching on the tile edge x = 1.5
+	touching = gpd.GeoDataFrame(geometry=[shapely.box(0, 0, 1, 1), shapely.box(2, 0, 3, 1)])
+	assertSame(touching, 0.5, 2, [2, 1])
+	assert len(bufferDissolve(touching, 0.5, join_style=2, partitions=[2, 1])) == 1
+	print('Done.')
@@ -0,0 +1,26 @@
+# -*- coding: utf-8 -*-
+"""
+* Updated on 2026/10/19
+* python3
+**
+* test of segmentedVolume with a cache, the results with default stages should match the uncached mode
+"""
+import math, pathlib, tempfile
+from lots.gis import rasterCache, segmentedVolume, segmentedVolumeHistogram
+
+file_dem = pathlib.Path('gis/dem.gpkg')
+with tempfile.TemporaryDirectory() as folder:
+	cache = rasterCache(folder)
+	data = segmentedVolume(file_dem)
+	data_cached = segmentedVolume(file_dem, cache=cache)	# builds the histogram
+	assert data_cached == segmentedVolume(file_dem, cache=cache)	# hits the cache
+	cache.clear()
+	assert segmentedVolumeHistogram(file_dem, cache=cache, maxElevations=10) == data_cached	# too many elevations to save
+	with cache.connect() as connection:
+		assert connection.execute('SELECT COUNT(*) FROM cache').fetchone()[0] == 0
+assert len(data) == len(data_cached)
+for line, line_cached in zip(data, data_cached):
+	assert line['stage'] == line_cached['stage']
+	assert line['area'] == line_cached['area']
+	assert math.isclose(line['volume'], line_cached['volume'], rel_tol=1e-5, abs_tol=1e-3)
+print('Done.')
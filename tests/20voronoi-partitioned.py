@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+"""
+* Updated on 2026/10/19
+* python3
+**
+* test of voronoiDiagram4plgPartitioned, the cells should match voronoiDiagram4plg, including overlapping polygons
+"""
+import geopandas as gpd
+import numpy as np
+import shapely
+from lots.gis import voronoiDiagram4plg, voronoiDiagram4plgPartitioned
+
+def cells(gdf_vd):
+	return dict(zip(gdf_vd['id'], gdf_vd.geometry.values))
+
+if __name__ == '__main__':
+	generator = np.random.default_rng(0)
+	x, y = generator.uniform(0, 100, (2, 200))
+	sizes = generator.uniform(1, 6, (2, 200))	# some boxes overlap
+	gdf = gpd.GeoDataFrame({'id': np.arange(200)}, geometry=shapely.box(x, y, x + sizes[0], y + sizes[1]))
+	assert shapely.STRtree(gdf.geometry.values).query(gdf.geometry.values, predicate='overlaps').size
+	mask = shapely.box(-5, -5, 110, 110)
+	
+	reference = cells(voronoiDiagram4plg(gdf, mask))
+	for partitions in (1, 3, [4, 2]):
+		partitioned = cells(voronoiDiagram4plgPartitioned(gdf, mask, partitions, processes=2))
+		assert reference.keys() == partitioned.keys(), partitions
+		for id, cell in reference.items():
+			assert shapely.symmetric_difference(cell, partitioned[id]).area < 1e-6 * cell.area, (partitions, id)
+	
+	far = gpd.GeoDataFrame({'id': [0]}, geometry=[shapely.box(1000, 1000, 1001, 1001)])	# no polygon around the mask
+	assert len(voronoiDiagram4plgPartitioned(far, mask, 2, halo=10)) == 0
+	print('Done.')
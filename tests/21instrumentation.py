@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+"""
+* Updated on 2026/10/19
+* python3
+**
+* test of instrumented calls with a collectorSink, the peak memory of an outer call should not be reset by nested calls
+"""
+import sys
+from lots.gis import collectorSink, instrumentation, instrumented
+
+@instrumented
+def inner(size):
+	return len(bytearray(size))
+
+@instrumented
+def outer(size):
+	data = bytearray(size)	# the peak of this call, freed before the nested call
+	del data
+	return inner(size // 100)
+
+with instrumentation(collectorSink()) as sink:
+	assert outer(20 * 1024**2) == 20 * 1024**2 // 100
+records = {record['function']: record for record in sink.records}
+assert [record['function'] for record in sink.records] == ['inner', 'outer']	# nested calls are sent first
+assert records['inner']['peakMemory'] is None
+if sys.version_info >= (3, 9):
+	assert records['outer']['peakMemory'] >= 20 * 1024**2, records['outer']['peakMemory']
+assert all(record['wallTime'] >= 0 and record['error'] == '' for record in sink.records)
+assert outer(10) == 0 and len(sink.records) == 2	# no sink registered
+print('Done.')
@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+"""
+* Updated on 2026/10/19
+* python3
+**
+* test of gdfIntersection, gdfClip and gdfGridding, the results should match geopandas overlay and clip, in serial and chunked modes
+"""
+import numpy as np
+import geopandas as gpd
+import shapely
+from lots.gis import gdfClip, gdfGridding, gdfIntersection, generateGridGdfForGeometry
+
+def pieces(gdf, fields):
+	'''Areas of pieces keyed by their attributes.'''
+	return sorted(zip(*[gdf[field] for field in fields], np.round(gdf.area.values, 9)))
+
+if __name__ == '__main__':
+	rng = np.random.default_rng(0)
+	x, y, w, h = rng.uniform([0, 0, 1, 1], [100, 100, 10, 10], (300, 4)).T
+	gdf01 = gpd.GeoDataFrame({'id': np.arange(300), 'name': 'a'}, geometry=shapely.box(x, y, x + w, y + h), crs='EPSG:3857')
+	x, y, r = rng.uniform([0, 0, 1], [100, 100, 8], (100, 3)).T
+	gdf02 = gpd.GeoDataFrame({'code': np.arange(100), 'name': 'b'}, geometry=shapely.buffer(shapely.points(x, y), r), crs='EPSG:3857')
+	
+	reference = gpd.overlay(gdf01, gdf02, how='intersection', keep_geom_type=True)
+	for chunkSize in (None, 64):
+		result = gdfIntersection(gdf01, gdf02, chunkSize=chunkSize, processes=2)
+		assert list(result.columns) == ['id', 'name_1', 'code', 'name_2', 'geometry'] and result.crs == gdf01.crs
+		assert pieces(result, ['id', 'code']) == pieces(reference, ['id', 'code']), chunkSize
+	
+	mask = gpd.GeoDataFrame(geometry=[shapely.Point(50, 50).buffer(30)], crs='EPSG:3857')
+	reference = gpd.clip(gdf01, mask)
+	for chunkSize in (None, 16):
+		result = gdfClip(gdf01, mask, chunkSize=chunkSize, processes=2)
+		assert sorted(result.index) == sorted(reference.index) and list(result.columns) == list(gdf01.columns)
+		assert pieces(result, ['id']) == pieces(reference, ['id']), chunkSize
+	assert sorted(gdfClip(gdf01, mask.to_crs('EPSG:4326')).index) == sorted(reference.index)	# mask re-projected to crs of `gdf`
+	within = gdf01.within(mask.geometry[0])
+	assert all(result.geometry[within[within].index].values == gdf01.geometry[within].values)	# kept as they are
+	
+	reference = gpd.overlay(gdf01, generateGridGdfForGeometry(gdf01, 20, 20), how='intersection', keep_geom_type=True)
+	for chunkSize in (None, 64):
+		result = gdfGridding(gdf01, 20, 20, chunkSize=chunkSize, processes=2)
+		assert len(result) == len(reference) and np.isclose(result.area.sum(), gdf01.area.sum())
+		assert pieces(result, ['id']) == pieces(reference, ['id']), chunkSize
+	print('Done.')
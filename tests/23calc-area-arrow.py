@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+"""
+* Updated on 2026/10/19
+* python3
+**
+* test of calcAreaArrow, areas should be square meters in the equal-area crs as geopandas calculates, in serial and chunked modes, including an empty input
+"""
+import pathlib, tempfile
+import numpy as np
+import geopandas as gpd
+import shapely
+from lots.gis import calcAreaArrow
+
+rng = np.random.default_rng(0)
+x, y, size = rng.uniform([100, 20, 0.01], [120, 40, 0.5], (200, 3)).T
+vectors = gpd.GeoDataFrame({'id': np.arange(200)}, geometry=shapely.box(x, y, x + size, y + size), crs='EPSG:4326')
+areas = vectors.to_crs('EPSG:6933').area.values
+threshold = np.median(areas)
+with tempfile.TemporaryDirectory() as folder:
+	inputVector, outputVector = pathlib.Path(folder) / 'input.gpkg', pathlib.Path(folder) / 'output.gpkg'
+	vectors.to_file(inputVector, driver='GPKG')
+	for chunkSize in (None, 32):
+		calcAreaArrow(inputVector, outputVector, areaThreshold=threshold, chunkSize=chunkSize)
+		result = gpd.read_file(outputVector)
+		assert result.crs == 'EPSG:4326' and len(result) == (areas > threshold).sum()
+		assert np.allclose(result['area'], np.sort(areas[areas > threshold])[::-1])
+		assert np.allclose(result.to_crs('EPSG:6933').area, result['area'])
+	calcAreaArrow(inputVector, outputVector, crs='EPSG:3857', sortAscending=None, chunkSize=32)	# written chunk by chunk
+	result = gpd.read_file(outputVector)
+	assert result.crs == 'EPSG:3857' and np.allclose(result['area'], areas)
+	
+	vectors.iloc[:0].to_file(inputVector, driver='GPKG')
+	for chunkSize, sortAscending in ((None, False), (32, False), (32, None)):
+		calcAreaArrow(inputVector, outputVector, chunkSize=chunkSize, sortAscending=sortAscending)
+		assert len(gpd.read_file(outputVector)) == 0
+print('Done.')
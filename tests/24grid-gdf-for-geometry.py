@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+"""
+* Updated on 2026/10/19
+* python3
+**
+* test of generateGridGdfForGeometry and generateGridGdfForGeometryByParts, grids should cover the geometry, cells kept with `intersects` should match geopandas
+"""
+import numpy as np
+import geopandas as gpd
+import shapely
+from lots.gis import generateGridGdfForGeometry, generateGridGdfForGeometryByParts
+
+def assertCovers(grid, geometry):
+	assert shapely.union_all(grid.geometry.values).covers(geometry)
+
+ring = shapely.Point(0, 0).buffer(10).difference(shapely.Point(0, 0).buffer(6))	# cells in the hole do not intersect
+gdf = gpd.GeoDataFrame(geometry=[ring, shapely.box(20, -3, 24, 3)], crs='EPSG:3857')
+union = shapely.union_all(gdf.geometry.values)
+
+grid = generateGridGdfForGeometry(gdf, 2, 1.5)
+assertCovers(grid, union)
+assert grid.crs == gdf.crs and np.allclose(grid.area, 3)
+kept = generateGridGdfForGeometry(gdf, 2, 1.5, intersects=True)
+reference = grid[grid.intersects(union)]
+assert len(kept) < len(grid) and sorted(map(shapely.to_wkb, kept.geometry)) == sorted(map(shapely.to_wkb, reference.geometry))
+assert generateGridGdfForGeometry(ring, 2, 2, crs='EPSG:4326').crs == 'EPSG:4326'	# a shapely geometry
+assert len(generateGridGdfForGeometry(gdf.geometry, 2, 1.5)) == len(grid)	# a GeoSeries
+
+for parts, count in ((3, 9), ([4], 16), ([5, 2], 10), ([7, 3], 21)):
+	grid = generateGridGdfForGeometryByParts(gdf, parts)
+	assert len(grid) == count, (parts, len(grid))
+	assertCovers(grid, union)
+	assert np.allclose(grid.area, grid.area[0])
+	kept = generateGridGdfForGeometryByParts(gdf, parts, intersects=True)
+	assert len(kept) == grid.intersects(union).sum()
+print('Done.')
@@ -0,0 +1,244 @@
+# -*- coding: utf-8 -*-
+"""
+* Updated on 2026/10/19
+* python3
+**
+* A minimal, eagerly evaluated stand-in of the `ee` module, to test client code of lots.gee offline
+* Usage: import fake_ee; fake_ee.install() before importing lots.gee
+* `depth` of objects is the depth of the computation graph a real `ee` client would send
+* `stats['nodes']` counts expression nodes built, a mapped function counts once as a real `ee` client traces it once
+* `stats['requests']` counts round-trips, ie, `getInfo()` calls
+"""
+import contextlib, random, sys, types
+
+import shapely
+from shapely.geometry import mapping, shape
+
+stats = {'nodes': 0, 'requests': 0}
+downloadUrlBase = 'http://127.0.0.1:8000'
+tracing = [True]
+
+def node():
+	if tracing[0]: stats['nodes'] += 1
+
+def reset():
+	stats['nodes'] = stats['requests'] = 0
+
+@contextlib.contextmanager
+def traced(enabled):
+	previous, tracing[0] = tracing[0], enabled and tracing[0]
+	try:
+		yield
+	finally:
+		tracing[0] = previous
+
+def mapOnce(func, items):
+	'''Apply a function to all items, counting nodes for the first only.'''
+	results = []
+	for i, item in enumerate(items):
+		with traced(i == 0):
+			results.append(func(item))
+	return results
+
+def request():
+	stats['requests'] += 1
+
+def value(obj):
+	return obj.value if isinstance(obj, Number) else obj
+
+class Number:
+	def __init__(self, number):
+		node()
+		self.value = value(number)
+		self.depth = getattr(number, 'depth', 1)
+	def add(self, other):
+		return Number(self.value + value(other))
+	def subtract(self, other):
+		return Number(self.value - value(other))
+	def multiply(self, other):
+		return Number(self.value * value(other))
+	def getInfo(self):
+		request()
+		return self.value
+
+class List:
+	def __init__(self, items, depth=1):
+		node()
+		self.items = list(items.items if isinstance(items, List) else items)
+		self.depth = depth
+	@staticmethod
+	def sequence(start, end, step=1):
+		items, i = [], start
+		while i <= end:
+			items.append(i); i += step
+		return List(items)
+	def map(self, func):
+		return List(mapOnce(func, self.items), self.depth + 1)
+	def flatten(self):
+		items = []
+		for item in self.items:
+			items.extend(item.items if isinstance(item, (List, FeatureCollection)) else [item])
+		return List(items, self.depth + 1)
+	def size(self):
+		return Number(len(self.items))
+	def get(self, index):
+		node()
+		return self.items[value(index)]
+	def getInfo(self):
+		request()
+		with traced(False):
+			return [item.toInfo() if hasattr(item, 'toInfo') else item for item in self.items]
+
+class Geometry:
+	def __init__(self, geojson):
+		node()
+		self.geojson = geojson
+		self.depth = 1
+	@staticmethod
+	def Rectangle(coords, *args, **kwargs):
+		x1, y1, x2, y2 = [value(c) for c in coords]
+		return Geometry({'type': 'Polygon', 'coordinates': [[[x1, y1], [x2, y1], [x2, y2], [x1, y2], [x1, y1]]]})
+	def shape(self):
+		return shape(self.geojson)
+	def toInfo(self):
+		return self.geojson
+	def getInfo(self):
+		request()
+		return self.toInfo()
+
+class Feature:
+	def __init__(self, geometry, properties=None):
+		node()
+		if isinstance(geometry, Feature):
+			geometry, properties = geometry._geometry, dict(geometry.properties)
+		elif isinstance(geometry, dict) and geometry.get('type') == 'Feature':	# client-side GeoJSON
+			geometry, properties = Geometry(geometry['geometry']), geometry.get('properties')
+		self._geometry = geometry
+		self.properties = dict(properties or {})
+		self.depth = getattr(geometry, 'depth', 1) + 1
+	def geometry(self):
+		node()
+		return self._geometry
+	def get(self, name):
+		node()
+		return self.properties.get(name)
+	def set(self, *args):
+		properties = dict(self.properties)
+		properties.update(args[0] if len(args) == 1 else {args[0]: args[1]})
+		return Feature(self._geometry, properties)
+	def intersection(self, right, maxError=None, proj=None):
+		right = right._geometry if isinstance(right, Feature) else right
+		return Feature(Geometry(mapping(self._geometry.shape().intersection(right.shape()))), self.properties)
+	def toInfo(self):
+		return {'type': 'Feature', 'geometry': self._geometry.toInfo() if self._geometry else None, 'properties': self.properties}
+	def getInfo(self):
+		request()
+		return self.toInfo()
+
+class FeatureCollection:
+	def __init__(self, features, depth=None):
+		node()
+		self.assetId = None
+		if isinstance(features, str):	# asset id, an empty table
+			self.assetId, features = features, []
+		elif isinstance(features, (FeatureCollection, List)):
+			self.assetId = getattr(features, 'assetId', None)
+			depth, features = features.depth + (1 if depth is None else depth), features.items
+		elif isinstance(features, Feature):
+			features = [features]
+		self.features = list(features)
+		self.depth = depth if depth is not None else 1 + max([getattr(f, 'depth', 1) for f in self.features], default=0)
+	@property
+	def items(self):
+		return self.features
+	def merge(self, other):
+		return FeatureCollection(self.features + other.features, max(self.depth, other.depth) + 1)
+	def map(self, func):
+		return FeatureCollection(mapOnce(func, self.features), self.depth + 1)
+	def iterate(self, func, first):
+		result = first
+		for i, feature in enumerate(self.features):
+			with traced(i == 0):
+				result = func(feature, result)
+		return FeatureCollection(result, self.depth + 1)
+	def flatten(self):
+		features = []
+		for feature in self.features:
+			features.extend(feature.items if isinstance(feature, (FeatureCollection, List)) else [feature])
+		return FeatureCollection(features, self.depth + 1)
+	def filterBounds(self, geometry):
+		geometry = geometry.shape()
+		return FeatureCollection([f for f in self.features if f._geometry.shape().intersects(geometry)], self.depth + 1)
+	def filter(self, condition):
+		return FeatureCollection([f for f in self.features if condition.predicate(f)], self.depth + 1)
+	def randomColumn(self, columnName='random', seed=0, distribution='uniform'):
+		generator = random.Random(seed)
+		return FeatureCollection([f.set(columnName, generator.random()) for f in self.features], self.depth + 1)
+	def size(self):
+		return Number(len(self.features))
+	def toList(self, count, offset=0):
+		return List(self.features[value(offset):value(offset) + value(count)], self.depth + 1)
+	def getDownloadURL(self, filetype=None, selectors=None, filename=None):
+		'''Url of `downloadUrlBase`/<asset id>, eg, served by a local HTTP server.'''
+		request()
+		return '%s/%s?filetype=%s' % (downloadUrlBase, self.assetId, filetype)
+	def toInfo(self):
+		return {'type': 'FeatureCollection', 'features': [feature.toInfo() for feature in self.features]}
+	def getInfo(self):
+		request()
+		return self.toInfo()
+
+class Filter:
+	def __init__(self, predicate):
+		node()
+		self.predicate = predicate
+	@staticmethod
+	def intersects(leftField='.geo', rightField='.geo', maxError=None):
+		return Filter(lambda left, right: left._geometry.shape().intersects(right._geometry.shape()))
+	@staticmethod
+	def gte(name, value):
+		return Filter(lambda feature: feature.properties[name] >= value)
+	@staticmethod
+	def lt(name, value):
+		return Filter(lambda feature: feature.properties[name] < value)
+	@staticmethod
+	def And(*filters):
+		return Filter(lambda feature: all(f.predicate(feature) for f in filters))
+
+class Join:
+	def __init__(self, matchesKey):
+		node()
+		self.matchesKey = matchesKey
+	@staticmethod
+	def saveAll(matchesKey, ordering=None, ascending=True, measureKey=None, outer=False):
+		return Join(matchesKey)
+	def apply(self, primary, secondary, condition):
+		node()
+		joined = []
+		with traced(False):
+			for feature in primary.features:
+				matches = [f for f in secondary.features if condition.predicate(feature, f)]
+				if matches: joined.append(feature.set(self.matchesKey, List(matches)))
+		return FeatureCollection(joined, max(primary.depth, secondary.depth) + 1)
+
+def computeFeatures(params):
+	'''Stand-in of `ee.data.computeFeatures`, page tokens are offsets.'''
+	request()
+	features = params['expression'].features
+	offset = int(params.get('pageToken') or 0)
+	end = offset + params.get('pageSize', 1000)
+	page = {'type': 'FeatureCollection', 'features': [feature.toInfo() for feature in features[offset:end]]}
+	if end < len(features): page['nextPageToken'] = str(end)
+	return page
+
+def Initialize(*args, **kwargs):
+	pass
+
+def install():
+	'''Register this module as `ee` in `sys.modules`.
+	'''
+	module = sys.modules[__name__]
+	module.Algorithms = types.SimpleNamespace(GeometryConstructors=types.SimpleNamespace(Rectangle=Geometry.Rectangle))
+	module.data = types.SimpleNamespace(computeFeatures=computeFeatures)
+	sys.modules['ee'] = module
+	return module